@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useMemo } from 'react';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
@@ -229,6 +229,12 @@ export const PhoneNumberPool: React.FC = () => {
     return number;
   };
 
+  // client_id -> client index so each assigned number resolves its client in O(1)
+  const clientsById = useMemo(
+    () => new Map(clients.map(c => [c.client_id, c])),
+    [clients]
+  );
+
   if (loading) {
     return (
       <div className="flex items-center justify-center min-h-[400px]">
@@ -425,7 +431,7 @@ export const PhoneNumberPool: React.FC = () => {
           ) : (
             <div className="grid gap-3">
               {assignedNumbers.map((number) => {
-                const client = clients.find(c => c.client_id === number.assigned_client_id);
+                const client = number.assigned_client_id ? clientsById.get(number.assigned_client_id) : undefined;
                 return (
                   <div
                     key={number.id}
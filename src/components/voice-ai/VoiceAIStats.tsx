@@ -63,37 +63,38 @@ export const VoiceAIStats: React.FC<VoiceAIStatsProps> = ({
           break;
       }
 
-      // Filter sessions by date range
-      const filteredSessions = sessions.filter(session => 
-        new Date(session.start_time) >= startDate
-      );
+      // Tally every stat in a single pass over the sessions in range,
+      // comparing epoch ms instead of building a Date per session
+      const startMs = startDate.getTime();
+      let totalCalls = 0;
+      let activeCalls = 0;
+      let completedCalls = 0;
+      let failedCalls = 0;
+      let durationSum = 0;
+      let durationCount = 0;
+      let totalRevenue = 0;
 
-      const totalCalls = filteredSessions.length;
-      const activeCalls = filteredSessions.filter(s => 
-        s.status === 'ringing' || s.status === 'in-progress'
-      ).length;
-      
-      const completedCalls = filteredSessions.filter(s => 
-        s.status === 'completed'
-      ).length;
-      
-      const failedCalls = filteredSessions.filter(s => 
-        s.status === 'failed' || s.status === 'no-answer'
-      ).length;
+      for (const s of sessions) {
+        if (!(Date.parse(s.start_time) >= startMs)) continue;
 
-      // Calculate average duration (only for completed calls)
-      const completedCallsWithDuration = filteredSessions.filter(s => 
-        s.status === 'completed' && s.duration_seconds > 0
-      );
-      
-      const avgDuration = completedCallsWithDuration.length > 0
-        ? completedCallsWithDuration.reduce((sum, s) => sum + s.duration_seconds, 0) / completedCallsWithDuration.length
-        : 0;
+        totalCalls++;
+        totalRevenue += s.cost_amount || 0;
+
+        if (s.status === 'ringing' || s.status === 'in-progress') {
+          activeCalls++;
+        } else if (s.status === 'completed') {
+          completedCalls++;
+          // Average duration only counts completed calls
+          if (s.duration_seconds > 0) {
+            durationSum += s.duration_seconds;
+            durationCount++;
+          }
+        } else if (s.status === 'failed' || s.status === 'no-answer') {
+          failedCalls++;
+        }
+      }
 
-      // Calculate total revenue
-      const totalRevenue = filteredSessions.reduce((sum, s) => 
-        sum + (s.cost_amount || 0), 0
-      );
+      const avgDuration = durationCount > 0 ? durationSum / durationCount : 0;
 
       // Calculate success rate
       const successRate = totalCalls > 0 ? (completedCalls / totalCalls) * 100 : 0;
@@ -118,17 +118,25 @@ export function useAnalytics(clientId: string | null, dateRange: string = '7days
         return date.toISOString().split('T')[0];
       });
 
-      const volumeData = last7Days.map(date => {
-        const dayCalls = calls.filter(s => s.created_at?.startsWith(date));
-        const dayChats = chats.filter(s => s.created_at?.startsWith(date));
-
-        const dayMinutes = dayCalls.reduce((sum, s) => sum + Math.ceil((s.duration_seconds || 0) / 60), 0) +
-                           dayChats.reduce((sum, s) => sum + Math.ceil((s.duration_seconds || 0) / 60), 0);
+      // Bucket sessions by their created_at date prefix (YYYY-MM-DD) in one pass,
+      // rather than re-scanning every call and chat once per day
+      const dayTotals = new Map(last7Days.map(date => [date, { sessions: 0, minutes: 0 }]));
+      const addToDay = (s: { created_at: string | null; duration_seconds: number | null }) => {
+        const day = s.created_at && dayTotals.get(s.created_at.slice(0, 10));
+        if (day) {
+          day.sessions++;
+          day.minutes += Math.ceil((s.duration_seconds || 0) / 60);
+        }
+      };
+      calls.forEach(addToDay);
+      chats.forEach(addToDay);
 
+      const volumeData = last7Days.map(date => {
+        const { sessions, minutes } = dayTotals.get(date)!;
         return {
           date: new Date(date).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-          sessions: dayCalls.length + dayChats.length,
-          minutes: dayMinutes
+          sessions,
+          minutes
         };
       });
 
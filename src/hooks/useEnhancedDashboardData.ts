@@ -54,20 +54,20 @@ export function useEnhancedDashboardData(clientId: string | null, region: string
       startOfMonth.setDate(1);
       startOfMonth.setHours(0, 0, 0, 0);
 
-      // Fetch phone calls
+      // Fetch phone calls (only the columns the metrics below read - no transcripts etc.)
       const { data: calls, error: callsError } = await supabase
         .from('call_sessions')
-        .select('*')
+        .select('created_at, start_time, status, duration_seconds, sentiment_score, primary_intent, transfer_requested')
         .eq('client_id', clientId)
         .gte('created_at', startOfMonth.toISOString())
         .order('created_at', { ascending: false });
 
       if (callsError) throw callsError;
 
-      // Fetch website chats
+      // Fetch website chats (only needed for the session count and per-hour breakdown)
       const { data: chats, error: chatsError } = await supabase
         .from('chat_sessions')
-        .select('*')
+        .select('start_time, duration_seconds')
         .eq('client_id', clientId)
         .gte('created_at', startOfMonth.toISOString())
         .order('created_at', { ascending: false });
@@ -100,53 +100,88 @@ export function useEnhancedDashboardData(clientId: string | null, region: string
         return;
       }
 
-      // Calculate sentiment
-      const callsWithSentiment = calls.filter(c => c.sentiment_score !== null);
-      const avgSentiment = callsWithSentiment.length > 0
-        ? callsWithSentiment.reduce((sum, c) => sum + (c.sentiment_score || 0), 0) / callsWithSentiment.length
-        : null;
+      // Day boundaries for the yesterday/today comparison
+      const yesterday = new Date();
+      yesterday.setDate(yesterday.getDate() - 1);
+      yesterday.setHours(0, 0, 0, 0);
+      const today = new Date();
+      today.setHours(0, 0, 0, 0);
+      const yesterdayMs = yesterday.getTime();
+      const todayMs = today.getTime();
+
+      // Tally every call metric in a single pass over the month's calls
+      let sentimentSum = 0;
+      let sentimentCount = 0;
+      let completedCount = 0;
+      let failedCount = 0;
+      let transferCount = 0;
+      let callsYesterday = 0;
+      let callsToday = 0;
+      let durationSum = 0;
+      let durationCount = 0;
+      const intentCounts = new Map<string, number>();
+      const hourData = new Map<number, { calls: number; minutes: number }>();
+
+      const addToHour = (startTime: string, durationSeconds: number | null) => {
+        const hour = new Date(startTime).getHours();
+        const minutes = Math.ceil((durationSeconds || 0) / 60); // Round UP
+        const existing = hourData.get(hour);
+        if (existing) {
+          existing.calls += 1;
+          existing.minutes += minutes;
+        } else {
+          hourData.set(hour, { calls: 1, minutes });
+        }
+      };
 
-      // Calculate success rate
-      const completedCalls = calls.filter(c => c.status === 'completed');
-      const failedCalls = calls.filter(c => ['failed', 'busy', 'no-answer'].includes(c.status));
-      const successRate = calls.length > 0 ? (completedCalls.length / calls.length) * 100 : 0;
+      for (const call of calls) {
+        if (call.sentiment_score !== null) {
+          sentimentSum += call.sentiment_score || 0;
+          sentimentCount++;
+        }
+
+        if (call.status === 'completed') {
+          completedCount++;
+        } else if (call.status === 'failed' || call.status === 'busy' || call.status === 'no-answer') {
+          failedCount++;
+        }
 
-      // Top intent
-      const intentCounts = new Map<string, number>();
-      calls.forEach(call => {
         if (call.primary_intent) {
           intentCounts.set(call.primary_intent, (intentCounts.get(call.primary_intent) || 0) + 1);
         }
-      });
-      const intentDistribution = Array.from(intentCounts.entries())
-        .map(([intent, count]) => ({ intent, count }))
-        .sort((a, b) => b.count - a.count);
-      const topIntent = intentDistribution[0]?.intent || null;
 
-      // Peak hour analysis (UPDATED: Now includes minutes from BOTH calls + chats)
-      const hourData = new Map<number, { calls: number; minutes: number }>();
+        if (call.transfer_requested === true) {
+          transferCount++;
+        }
 
-      // Process phone calls
-      (calls || []).forEach(call => {
-        const hour = new Date(call.start_time).getHours();
-        const minutes = Math.ceil((call.duration_seconds || 0) / 60); // Round UP
-        const existing = hourData.get(hour) || { calls: 0, minutes: 0 };
-        hourData.set(hour, {
-          calls: existing.calls + 1,
-          minutes: existing.minutes + minutes
-        });
-      });
+        const createdMs = new Date(call.created_at).getTime();
+        if (createdMs >= todayMs) {
+          callsToday++;
+        } else if (createdMs >= yesterdayMs) {
+          callsYesterday++;
+        }
+
+        if (call.duration_seconds !== null && call.duration_seconds > 0) {
+          durationSum += call.duration_seconds;
+          durationCount++;
+        }
+
+        // Peak hour analysis (UPDATED: Now includes minutes from BOTH calls + chats)
+        addToHour(call.start_time, call.duration_seconds);
+      }
 
       // Process website chats
-      (chats || []).forEach(chat => {
-        const hour = new Date(chat.start_time).getHours();
-        const minutes = Math.ceil((chat.duration_seconds || 0) / 60); // Round UP
-        const existing = hourData.get(hour) || { calls: 0, minutes: 0 };
-        hourData.set(hour, {
-          calls: existing.calls + 1,
-          minutes: existing.minutes + minutes
-        });
-      });
+      for (const chat of chats || []) {
+        addToHour(chat.start_time, chat.duration_seconds);
+      }
+
+      const avgSentiment = sentimentCount > 0 ? sentimentSum / sentimentCount : null;
+      const successRate = (completedCount / calls.length) * 100;
+
+      const intentDistribution = Array.from(intentCounts.entries())
+        .map(([intent, count]) => ({ intent, count }))
+        .sort((a, b) => b.count - a.count);
+      const topIntent = intentDistribution[0]?.intent || null;
 
       const callsByHour = Array.from(hourData.entries())
         .map(([hour, data]) => ({ hour, calls: data.calls, minutes: data.minutes }))
@@ -157,35 +192,14 @@ export function useEnhancedDashboardData(clientId: string | null, region: string
         : null;
 
       // Transfer metrics
-      const transferCalls = calls.filter(c => c.transfer_requested === true);
-      const transferRate = calls.length > 0 ? (transferCalls.length / calls.length) * 100 : 0;
-
-      // Yesterday comparison
-      const yesterday = new Date();
-      yesterday.setDate(yesterday.getDate() - 1);
-      yesterday.setHours(0, 0, 0, 0);
-      const today = new Date();
-      today.setHours(0, 0, 0, 0);
-
-      const callsYesterday = calls.filter(c => {
-        const callDate = new Date(c.created_at);
-        return callDate >= yesterday && callDate < today;
-      }).length;
-
-      const callsToday = calls.filter(c => {
-        const callDate = new Date(c.created_at);
-        return callDate >= today;
-      }).length;
+      const transferRate = (transferCount / calls.length) * 100;
 
       const callsChangePercent = callsYesterday > 0
         ? ((callsToday - callsYesterday) / callsYesterday) * 100
         : callsToday > 0 ? 100 : 0;
 
       // Calculate average call duration (in minutes)
-      const callsWithDuration = calls.filter(c => c.duration_seconds !== null && c.duration_seconds > 0);
-      const avgCallDuration = callsWithDuration.length > 0
-        ? callsWithDuration.reduce((sum, c) => sum + (c.duration_seconds || 0), 0) / callsWithDuration.length / 60
-        : null;
+      const avgCallDuration = durationCount > 0 ? durationSum / durationCount / 60 : null;
 
       // NOTE: Trial credits are fetched from useCurrentClient hook, not here
       // This hook should only focus on analytics from call_sessions
@@ -194,14 +208,14 @@ export function useEnhancedDashboardData(clientId: string | null, region: string
         avgSentiment,
         sentimentTrend: callsChangePercent > 5 ? 'up' : callsChangePercent < -5 ? 'down' : 'stable',
         successRate,
-        totalCompletedCalls: completedCalls.length,
-        totalFailedCalls: failedCalls.length,
+        totalCompletedCalls: completedCount,
+        totalFailedCalls: failedCount,
         topIntent,
         intentDistribution,
         peakHour,
         callsByHour,
         transferRate,
-        transferCount: transferCalls.length,
+        transferCount,
         callsYesterday,
         callsChangePercent,
         callsThisMonth: calls.length,
@@ -213,14 +213,17 @@ const CentralHQ = () => {
     callsToday: client.calls_today || 0
   }));
 
+  // Count offline clients once per render (used by both the alert check and its message)
+  const offlineClientCount = clients.reduce((count, c) => c.live_status === 'offline' ? count + 1 : count, 0);
+
   // Generate alerts based on real data
   const systemAlerts = [
     ...(systemMetrics.activeClients === 0 ? [{ id: 1, type: "warning", message: "No active clients detected", time: "Now" }] : []),
     ...(systemMetrics.callsToday > 500 ? [{ id: 2, type: "warning", message: `High call volume today: ${systemMetrics.callsToday} calls`, time: "Live" }] : []),
-    ...(clients.filter(c => c.live_status === 'offline').length > 0 ? [{ 
+    ...(offlineClientCount > 0 ? [{ 
       id: 3,
       type: "error", 
-      message: `${clients.filter(c => c.live_status === 'offline').length} clients offline`, 
+      message: `${offlineClientCount} clients offline`, 
       time: "Live" 
     }] : []),
     { id: 4, type: "info", message: `System healthy - ${systemMetrics.activeClients} active clients`, time: lastRefresh.toLocaleTimeString() },
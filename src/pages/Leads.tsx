@@ -124,22 +124,16 @@ export default function Leads() {
     // CSV headers
     const headers = ['Name', 'Email', 'Phone', 'Notes', 'Source', 'Status', 'Captured Date'];
 
-    // CSV rows
-    const rows = leads.map(lead => [
-      lead.name || '',
-      lead.email || '',
-      lead.phone || '',
-      (lead.notes || '').replace(/"/g, '""'), // Escape quotes
-      lead.source,
-      lead.status,
-      new Date(lead.captured_at).toLocaleString()
-    ]);
+    // CSV rows - the column layout is fixed, so format each row directly
+    // instead of building and re-joining a per-row cell array
+    const rows = leads.map(lead =>
+      `"${lead.name || ''}","${lead.email || ''}","${lead.phone || ''}",` +
+      `"${(lead.notes || '').replace(/"/g, '""')}",` + // Escape quotes
+      `"${lead.source}","${lead.status}","${new Date(lead.captured_at).toLocaleString()}"`
+    );
 
     // Combine headers and rows
-    const csvContent = [
-      headers.join(','),
-      ...rows.map(row => row.map(cell => `"${cell}"`).join(','))
-    ].join('\n');
+    const csvContent = [headers.join(','), ...rows].join('\n');
 
     // Create and download file
     const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
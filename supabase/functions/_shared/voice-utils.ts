@@ -34,6 +34,99 @@ interface ClientData {
   email?: string;
 }
 
+// Intl.DateTimeFormat construction is expensive (locale + tz resolution),
+// so keep one formatter per timezone for the life of the isolate
+const dateTimeFormatters = new Map<string, Intl.DateTimeFormat>();
+
+function getDateTimeFormatter(timezone: string): Intl.DateTimeFormat {
+  let formatter = dateTimeFormatters.get(timezone);
+  if (!formatter) {
+    formatter = new Intl.DateTimeFormat('en-US', {
+      timeZone: timezone,
+      weekday: 'long',
+      year: 'numeric',
+      month: 'long',
+      day: 'numeric',
+      hour: 'numeric',
+      minute: '2-digit',
+      hour12: true
+    });
+    dateTimeFormatters.set(timezone, formatter);
+  }
+  return formatter;
+}
+
+interface BookingFormatters {
+  date: Intl.DateTimeFormat;    // YYYY-MM-DD (en-CA)
+  weekday: Intl.DateTimeFormat; // e.g. "Monday"
+  time: Intl.DateTimeFormat;    // e.g. "09:30 AM"
+}
+
+// Same idea for the appointment-booking block, which formats date, weekday
+// and time separately - toLocale*String would build a fresh formatter each call
+const bookingFormatters = new Map<string, BookingFormatters>();
+
+function getBookingFormatters(timezone: string): BookingFormatters {
+  let formatters = bookingFormatters.get(timezone);
+  if (!formatters) {
+    formatters = {
+      date: new Intl.DateTimeFormat('en-CA', { timeZone: timezone }),
+      weekday: new Intl.DateTimeFormat('en-US', { timeZone: timezone, weekday: 'long' }),
+      time: new Intl.DateTimeFormat('en-US', {
+        timeZone: timezone,
+        hour: '2-digit',
+        minute: '2-digit',
+        hour12: true
+      }),
+    };
+    bookingFormatters.set(timezone, formatters);
+  }
+  return formatters;
+}
+
+const DAYS_OF_WEEK = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'];
+
+interface CompiledSchedule {
+  // Per-day "BUSINESS HOURS" paragraph, keyed by lowercase weekday (only days present in business_hours)
+  days: Record<string, string>;
+  // "Full Schedule" block, identical for every day of the week
+  fullSchedule: string;
+}
+
+// business_hours only changes when the client record is reloaded, so compile
+// each object's prompt text once instead of re-walking it on every turn
+const compiledSchedules = new WeakMap<object, CompiledSchedule>();
+
+function getCompiledSchedule(hours: any): CompiledSchedule {
+  let schedule = compiledSchedules.get(hours);
+  if (schedule) return schedule;
+
+  let fullSchedule = `\n\nFull Schedule:`;
+  const days: Record<string, string> = {};
+
+  for (const day of DAYS_OF_WEEK) {
+    const dayHours = hours[day];
+    if (!dayHours) continue;
+
+    const dayLabel = day.charAt(0).toUpperCase() + day.slice(1);
+    if (dayHours.closed) {
+      days[day] = `\n\nBUSINESS HOURS:
+We are CLOSED today (${day}). `;
+      fullSchedule += `\n- ${dayLabel}: Closed`;
+    } else if (dayHours.open && dayHours.close) {
+      days[day] = `\n\nBUSINESS HOURS:
+Today we are open from ${dayHours.open} to ${dayHours.close}. `;
+      fullSchedule += `\n- ${dayLabel}: ${dayHours.open} - ${dayHours.close}`;
+    } else {
+      days[day] = '';
+    }
+  }
+
+  schedule = { days, fullSchedule };
+  compiledSchedules.set(hours, schedule);
+  return schedule;
+}
+
 /**
  * Get current datetime info in business timezone with business hours
  */
@@ -41,57 +134,22 @@ function getCurrentDateTimeContext(client: ClientData): string {
   const timezone = client.timezone || 'America/New_York';
   const now = new Date();
 
-  // Format current datetime in business timezone
-  const formatter = new Intl.DateTimeFormat('en-US', {
-    timeZone: timezone,
-    weekday: 'long',
-    year: 'numeric',
-    month: 'long',
-    day: 'numeric',
-    hour: 'numeric',
-    minute: '2-digit',
-    hour12: true
-  });
-
-  const currentDateTime = formatter.format(now);
-
-  // Get current day of week (lowercase for business_hours lookup)
-  const dayFormatter = new Intl.DateTimeFormat('en-US', {
-    timeZone: timezone,
-    weekday: 'long'
-  });
-  const currentDay = dayFormatter.format(now).toLowerCase();
+  // Format current datetime in business timezone; the weekday for the
+  // business_hours lookup comes from the same formatted parts
+  const parts = getDateTimeFormatter(timezone).formatToParts(now);
+  const currentDateTime = parts.map(part => part.value).join('');
+  const currentDay = (parts.find(part => part.type === 'weekday')?.value ?? '').toLowerCase();
 
   let contextString = `CURRENT DATE & TIME:
 Today is ${currentDateTime} (${timezone} timezone)`;
 
   // Add business hours if available
   if (client.business_hours && typeof client.business_hours === 'object') {
-    const hours = client.business_hours;
-    const todayHours = hours[currentDay];
-
-    if (todayHours) {
-      if (todayHours.closed) {
-        contextString += `\n\nBUSINESS HOURS:
-We are CLOSED today (${currentDay}). `;
-      } else if (todayHours.open && todayHours.close) {
-        contextString += `\n\nBUSINESS HOURS:
-Today we are open from ${todayHours.open} to ${todayHours.close}. `;
-      }
-
-      // Add full week schedule
-      contextString += `\n\nFull Schedule:`;
-      const daysOfWeek = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'];
-      for (const day of daysOfWeek) {
-        const dayHours = hours[day];
-        if (dayHours) {
-          if (dayHours.closed) {
-            contextString += `\n- ${day.charAt(0).toUpperCase() + day.slice(1)}: Closed`;
-          } else if (dayHours.open && dayHours.close) {
-            contextString += `\n- ${day.charAt(0).toUpperCase() + day.slice(1)}: ${dayHours.open} - ${dayHours.close}`;
-          }
-        }
-      }
+    const schedule = getCompiledSchedule(client.business_hours);
+    const todayHours = schedule.days[currentDay];
+
+    if (todayHours !== undefined) {
+      contextString += todayHours + schedule.fullSchedule;
     }
   }
 
@@ -339,26 +397,20 @@ ${(() => {
   const now = new Date();
   const timezone = client.timezone || 'America/New_York';
 
+  const formatters = getBookingFormatters(timezone);
+
   // Get date in client's timezone
-  const dateStr = now.toLocaleDateString('en-CA', { timeZone: timezone }); // YYYY-MM-DD
+  const dateStr = formatters.date.format(now); // YYYY-MM-DD
 
   // Get day of week in client's timezone
-  const dayOfWeek = now.toLocaleDateString('en-US', {
-    timeZone: timezone,
-    weekday: 'long'
-  });
+  const dayOfWeek = formatters.weekday.format(now);
 
   return `Current date: ${dateStr} (${dayOfWeek})
-Current time: ${now.toLocaleTimeString('en-US', {
-    timeZone: timezone,
-    hour: '2-digit',
-    minute: '2-digit',
-    hour12: true
-  })}
+Current time: ${formatters.time.format(now)}
 Timezone: ${timezone}
 
 Use this to calculate relative dates:
-- "tomorrow" = ${new Date(now.getTime() + 86400000).toLocaleDateString('en-CA', { timeZone: timezone })}
+- "tomorrow" = ${formatters.date.format(now.getTime() + 86400000)}
 - "today" = ${dateStr}
 - When customer says "next Monday", "this Friday", etc., calculate from today's date above`;
 })()}
@@ -5,6 +5,17 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+// Response headers are identical for every snippet, so build them once
+const audioResponseHeaders = {
+  ...corsHeaders,
+  'Content-Type': 'text/plain',
+  'Cache-Control': 'public, max-age=3600',
+};
+
+// Base64-encoded snippets keyed by file path - the same handful of snippets
+// are served on every call, so read + encode each one only once per isolate
+const encodedSnippetCache = new Map<string, string>();
+
 serve(async (req) => {
   // Handle CORS preflight requests
   if (req.method === 'OPTIONS') {
@@ -48,30 +59,32 @@ serve(async (req) => {
 
     console.log(`🎵 Attempting to serve audio: ${audioPath}`);
 
-    // Read the audio file
-    let audioData: Uint8Array;
-    try {
-      audioData = await Deno.readFile(audioPath);
-    } catch (error) {
-      console.error(`❌ Audio file not found: ${audioPath}`, error);
-      return new Response(
-        JSON.stringify({ error: 'Audio snippet not found' }),
-        { 
-          status: 404, 
-          headers: { ...corsHeaders, 'Content-Type': 'application/json' } 
-        }
-      );
-    }
+    let base64Audio = encodedSnippetCache.get(audioPath);
 
-    // Convert to base64 for Twilio
-    const base64Audio = btoa(String.fromCharCode(...audioData));
+    if (!base64Audio) {
+      // Read the audio file
+      let audioData: Uint8Array;
+      try {
+        audioData = await Deno.readFile(audioPath);
+      } catch (error) {
+        console.error(`❌ Audio file not found: ${audioPath}`, error);
+        return new Response(
+          JSON.stringify({ error: 'Audio snippet not found' }),
+          { 
+            status: 404, 
+            headers: { ...corsHeaders, 'Content-Type': 'application/json' } 
+          }
+        );
+      }
+
+      // Convert to base64 for Twilio
+      base64Audio = btoa(String.fromCharCode(...audioData));
+      encodedSnippetCache.set(audioPath, base64Audio);
+    }
 
     return new Response(base64Audio, {
       status: 200,
-      headers: {
-        ...corsHeaders,
-        'Content-Type': 'text/plain',
-      },
+      headers: audioResponseHeaders,
     });
 
   } catch (error) {
@@ -6,9 +6,47 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+const jsonHeaders = { ...corsHeaders, 'Content-Type': 'application/json' };
+
 // Twilio credentials
 const TWILIO_ACCOUNT_SID = Deno.env.get('TWILIO_ACCOUNT_SID');
 const TWILIO_AUTH_TOKEN = Deno.env.get('TWILIO_AUTH_TOKEN');
+const TWILIO_CALLS_URL = `https://api.twilio.com/2010-04-01/Accounts/${TWILIO_ACCOUNT_SID}/Calls`;
+const TWILIO_AUTH_HEADER = 'Basic ' + btoa(`${TWILIO_ACCOUNT_SID}:${TWILIO_AUTH_TOKEN}`);
+
+// Verbose request/response logging (transcripts, full Twilio payloads) is opt-in
+const DEBUG_LOGS = Deno.env.get('DEBUG_LOGS') === 'true';
+
+// Supabase client (shared across requests)
+const supabase = createClient(
+  Deno.env.get('SUPABASE_URL')!,
+  Deno.env.get('SUPABASE_SERVICE_ROLE_KEY')!
+);
+
+// Transfer keywords, compiled once into a single case-insensitive pattern so
+// each transcript is scanned in one pass instead of once per keyword. Each
+// keyword gets its own lookahead group; the lowest group index seen anywhere
+// in the transcript is the first keyword in list order (list priority).
+const TRANSFER_KEYWORDS = [
+  'transfer', 'speak to someone', 'talk to a person', 'human',
+  'agent', 'representative', 'real person', 'live person',
+  'speak to agent', 'talk to agent', 'escalate'
+];
+const TRANSFER_KEYWORD_REGEX = new RegExp(`(?=${TRANSFER_KEYWORDS.map(k => `(${k})`).join('|')})`, 'gi');
+
+function findTransferKeyword(transcript: string): string | null {
+  let best = TRANSFER_KEYWORDS.length;
+  for (const match of transcript.matchAll(TRANSFER_KEYWORD_REGEX)) {
+    for (let i = 1; i <= best && i < match.length; i++) {
+      if (match[i] !== undefined) {
+        best = i - 1;
+        break;
+      }
+    }
+    if (best === 0) break;
+  }
+  return best < TRANSFER_KEYWORDS.length ? TRANSFER_KEYWORDS[best] : null;
+}
 
 serve(async (req) => {
   // Handle CORS preflight
@@ -17,37 +55,26 @@ serve(async (req) => {
   }
 
   try {
-    const supabaseUrl = Deno.env.get('SUPABASE_URL')!;
-    const supabaseKey = Deno.env.get('SUPABASE_SERVICE_ROLE_KEY')!;
-    const supabase = createClient(supabaseUrl, supabaseKey);
-
     const { call_sid, transcript, client_id } = await req.json();
 
-    console.log('Agent transfer request:', { call_sid, client_id, transcript: transcript?.substring(0, 100) });
+    if (DEBUG_LOGS) {
+      console.log('Agent transfer request:', { call_sid, client_id, transcript: transcript?.substring(0, 100) });
+    }
 
     if (!call_sid || !client_id) {
       return new Response(
         JSON.stringify({ error: 'Missing required fields: call_sid, client_id' }),
-        { status: 400, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+        { status: 400, headers: jsonHeaders }
       );
     }
 
     // Check transcript for transfer keywords
-    const transferKeywords = [
-      'transfer', 'speak to someone', 'talk to a person', 'human', 
-      'agent', 'representative', 'real person', 'live person',
-      'speak to agent', 'talk to agent', 'escalate'
-    ];
-
-    const transcriptLower = (transcript || '').toLowerCase();
-    const hasTransferIntent = transferKeywords.some(keyword => 
-      transcriptLower.includes(keyword)
-    );
+    const keywordMatch = findTransferKeyword(transcript || '');
+    const hasTransferIntent = keywordMatch !== null;
 
     let transferReason = 'Customer requested transfer';
-    if (hasTransferIntent) {
-      const matchedKeyword = transferKeywords.find(keyword => transcriptLower.includes(keyword));
-      transferReason = `Customer used keyword: "${matchedKeyword}"`;
+    if (keywordMatch) {
+      transferReason = `Customer used keyword: "${keywordMatch}"`;
     }
 
     // Query voice_ai_clients for transfer number
@@ -61,7 +88,7 @@ serve(async (req) => {
       console.error('Error fetching client:', clientError);
       return new Response(
         JSON.stringify({ error: 'Client not found' }),
-        { status: 404, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+        { status: 404, headers: jsonHeaders }
       );
     }
 
@@ -88,14 +115,14 @@ serve(async (req) => {
           error: 'Transfer not available',
           message: 'Call transfer is not enabled for this client or transfer number is not configured'
         }),
-        { status: 400, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+        { status: 400, headers: jsonHeaders }
       );
     }
 
     const transferNumber = clientData.call_transfer_number;
 
-    // Log the transfer
-    const { error: logError } = await supabase
+    // Log the transfer (keep the row id so status updates hit the primary key)
+    const { data: transferLog, error: logError } = await supabase
       .from('agent_transfers')
       .insert({
         call_sid,
@@ -108,12 +135,18 @@ serve(async (req) => {
           business_name: clientData.business_name,
           has_transfer_intent: hasTransferIntent
         }
-      });
+      })
+      .select('id')
+      .single();
 
     if (logError) {
       console.error('Error logging transfer:', logError);
     }
 
+    // Status updates target the logged row by primary key; if the insert
+    // failed there is no id, so fall back to matching on call_sid
+    const transferLogMatch = transferLog?.id ? { id: transferLog.id } : { call_sid };
+
     // Generate TwiML for transfer
     const twiml = `<?xml version="1.0" encoding="UTF-8"?>
 <Response>
@@ -129,12 +162,12 @@ serve(async (req) => {
     // CRITICAL: Use Twilio REST API to UPDATE the active call with new TwiML
     // This disconnects the WebSocket and executes the Dial command
     try {
-      const twilioUrl = `https://api.twilio.com/2010-04-01/Accounts/${TWILIO_ACCOUNT_SID}/Calls/${call_sid}.json`;
+      const twilioUrl = `${TWILIO_CALLS_URL}/${call_sid}.json`;
 
       const updateResponse = await fetch(twilioUrl, {
         method: 'POST',
         headers: {
-          'Authorization': 'Basic ' + btoa(`${TWILIO_ACCOUNT_SID}:${TWILIO_AUTH_TOKEN}`),
+          'Authorization': TWILIO_AUTH_HEADER,
           'Content-Type': 'application/x-www-form-urlencoded',
         },
         body: new URLSearchParams({
@@ -149,7 +182,10 @@ serve(async (req) => {
       }
 
       const updateResult = await updateResponse.json();
-      console.log('Call updated successfully:', updateResult);
+      console.log('Call updated successfully:', call_sid);
+      if (DEBUG_LOGS) {
+        console.log('Twilio call update response:', updateResult);
+      }
 
       // Update transfer status to completed
       await supabase
@@ -162,7 +198,7 @@ serve(async (req) => {
             twilio_response: updateResult
           }
         })
-        .eq('call_sid', call_sid);
+        .match(transferLogMatch);
 
       return new Response(
         JSON.stringify({
@@ -172,7 +208,7 @@ serve(async (req) => {
         }),
         {
           status: 200,
-          headers: { ...corsHeaders, 'Content-Type': 'application/json' }
+          headers: jsonHeaders
         }
       );
 
@@ -188,7 +224,7 @@ serve(async (req) => {
             error: twilioError instanceof Error ? twilioError.message : 'Unknown error'
           }
         })
-        .eq('call_sid', call_sid);
+        .match(transferLogMatch);
 
       throw twilioError;
     }
@@ -200,7 +236,7 @@ serve(async (req) => {
       JSON.stringify({ error: errorMessage }),
       { 
         status: 500, 
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' }
+        headers: jsonHeaders
       }
     );
   }
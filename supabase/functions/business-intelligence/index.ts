@@ -185,11 +185,17 @@ function calculateConversionFunnel(sessions: any[]) {
 }
 
 function calculateRevenueForecast(sessions: any[]) {
-  const totalRevenue = sessions.reduce((sum, s) => sum + (s.cost_amount || 0), 0);
+  // Sum revenue and collect distinct call days (YYYY-MM-DD) in one pass
+  let totalRevenue = 0;
+  const callDays = new Set<string>();
+  for (const s of sessions) {
+    totalRevenue += s.cost_amount || 0;
+    callDays.add(s.created_at.slice(0, 10));
+  }
   const avgCallCost = sessions.length > 0 ? totalRevenue / sessions.length : 0;
   
   // Calculate daily average
-  const days = [...new Set(sessions.map(s => s.created_at.split('T')[0]))].length || 1;
+  const days = callDays.size || 1;
   const dailyAvgCalls = sessions.length / days;
   const dailyAvgRevenue = totalRevenue / days;
 
@@ -6,6 +6,25 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+const jsonHeaders = { ...corsHeaders, 'Content-Type': 'application/json' };
+
+// Fallback schedule for clients without business_hours (shared, never mutated)
+const DEFAULT_BUSINESS_HOURS: Record<string, any> = {
+  monday: { open: '09:00', close: '17:00' },
+  tuesday: { open: '09:00', close: '17:00' },
+  wednesday: { open: '09:00', close: '17:00' },
+  thursday: { open: '09:00', close: '17:00' },
+  friday: { open: '09:00', close: '17:00' },
+  saturday: { open: '10:00', close: '14:00' },
+  sunday: { closed: true }
+};
+
+// Date.getDay() index -> business_hours key
+const DAY_NAMES = ['sunday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday'];
+
+// Slot labels (e.g. "09:30 AM") - one formatter instead of toLocaleTimeString per slot
+const SLOT_DISPLAY_FORMATTER = new Intl.DateTimeFormat('en-US', { hour: '2-digit', minute: '2-digit' });
+
 serve(async (req) => {
   if (req.method === 'OPTIONS') {
     return new Response(null, { headers: corsHeaders });
@@ -55,7 +74,7 @@ serve(async (req) => {
       }),
       {
         status: 500,
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        headers: jsonHeaders,
       }
     );
   }
@@ -65,18 +84,10 @@ async function getAvailableSlots(params: any, client: any) {
   const { date, duration_minutes = 30 } = params;
 
   // Parse business hours from client
-  const businessHours = client.business_hours || {
-    monday: { open: '09:00', close: '17:00' },
-    tuesday: { open: '09:00', close: '17:00' },
-    wednesday: { open: '09:00', close: '17:00' },
-    thursday: { open: '09:00', close: '17:00' },
-    friday: { open: '09:00', close: '17:00' },
-    saturday: { open: '10:00', close: '14:00' },
-    sunday: { closed: true }
-  };
+  const businessHours = client.business_hours || DEFAULT_BUSINESS_HOURS;
 
   const targetDate = new Date(date);
-  const dayName = targetDate.toLocaleDateString('en-US', { weekday: 'long' }).toLowerCase();
+  const dayName = DAY_NAMES[targetDate.getDay()];
   const dayHours = businessHours[dayName];
 
   if (!dayHours || dayHours.closed) {
@@ -86,34 +97,26 @@ async function getAvailableSlots(params: any, client: any) {
         available_slots: [],
         message: 'Business is closed on this day'
       }),
-      { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+      { headers: jsonHeaders }
     );
   }
 
-  // Generate time slots
+  // Generate time slots - walk integer millisecond offsets between open and
+  // close rather than allocating and comparing Date objects for every step
   const slots = [];
   const [openHour, openMin] = dayHours.open.split(':').map(Number);
   const [closeHour, closeMin] = dayHours.close.split(':').map(Number);
-  
-  let currentTime = new Date(targetDate);
-  currentTime.setHours(openHour, openMin, 0, 0);
-  
-  const closingTime = new Date(targetDate);
-  closingTime.setHours(closeHour, closeMin, 0, 0);
-
-  while (currentTime < closingTime) {
-    const endTime = new Date(currentTime.getTime() + duration_minutes * 60000);
-    if (endTime <= closingTime) {
-      slots.push({
-        start: currentTime.toISOString(),
-        end: endTime.toISOString(),
-        display: currentTime.toLocaleTimeString('en-US', { 
-          hour: '2-digit', 
-          minute: '2-digit' 
-        })
-      });
-    }
-    currentTime = endTime;
+
+  const openingMs = new Date(targetDate).setHours(openHour, openMin, 0, 0);
+  const closingMs = new Date(targetDate).setHours(closeHour, closeMin, 0, 0);
+  const slotMs = duration_minutes * 60000;
+
+  for (let startMs = openingMs; startMs + slotMs <= closingMs; startMs += slotMs) {
+    slots.push({
+      start: new Date(startMs).toISOString(),
+      end: new Date(startMs + slotMs).toISOString(),
+      display: SLOT_DISPLAY_FORMATTER.format(startMs)
+    });
   }
 
   return new Response(
@@ -122,7 +125,7 @@ async function getAvailableSlots(params: any, client: any) {
       available_slots: slots,
       date: date
     }),
-    { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+    { headers: jsonHeaders }
   );
 }
 
@@ -139,7 +142,7 @@ async function checkAvailability(params: any, client: any) {
       start_time,
       end_time
     }),
-    { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+    { headers: jsonHeaders }
   );
 }
 
@@ -164,9 +167,12 @@ async function createBooking(params: any, clientId: string, client: any, supabas
   const durationMinutes = Math.round((endDate.getTime() - startDate.getTime()) / 60000);
 
   // Extract date and time components
-  const date = startDate.toISOString().split('T')[0]; // YYYY-MM-DD
-  const start_time_only = startDate.toTimeString().split(' ')[0].substring(0, 5); // HH:MM
-  const end_time_only = endDate.toTimeString().split(' ')[0].substring(0, 5); // HH:MM
+  const date = startDate.toISOString().slice(0, 10); // YYYY-MM-DD
+  const start_time_only = startDate.toTimeString().slice(0, 5); // HH:MM
+  const end_time_only = endDate.toTimeString().slice(0, 5); // HH:MM
+
+  // One timestamp for both audit columns
+  const now = new Date().toISOString();
 
   // Store appointment in database (FIXED: 'bookings' → 'appointments')
   const { data: appointment, error: appointmentError } = await supabase
@@ -185,8 +191,8 @@ async function createBooking(params: any, clientId: string, client: any, supabas
       session_id: session_id || null,
       lead_id: lead_id,
       notes: notes || null,
-      created_at: new Date().toISOString(),
-      updated_at: new Date().toISOString()
+      created_at: now,
+      updated_at: now
     })
     .select()
     .single();
@@ -201,7 +207,7 @@ async function createBooking(params: any, clientId: string, client: any, supabas
       appointment: appointment,
       message: 'Appointment scheduled successfully'
     }),
-    { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+    { headers: jsonHeaders }
   );
 }
 
@@ -231,6 +237,6 @@ async function requestBookingApproval(params: any, clientId: string, supabase: a
       status: newStatus,
       message: `Appointment ${action}d successfully`
     }),
-    { headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+    { headers: jsonHeaders }
   );
 }
@@ -30,8 +30,9 @@ function pcmToWav(pcmData: Uint8Array, sampleRate: number, numChannels: number =
   const byteRate = sampleRate * numChannels * bitsPerSample / 8;
   const blockAlign = numChannels * bitsPerSample / 8;
   const dataSize = pcmData.length;
-  const header = new ArrayBuffer(44);
-  const view = new DataView(header);
+  // Write the 44-byte header straight into the output buffer (no separate header copy)
+  const wavFile = new Uint8Array(44 + dataSize);
+  const view = new DataView(wavFile.buffer);
 
   // RIFF identifier
   view.setUint32(0, 0x52494646, false); // "RIFF"
@@ -60,10 +61,8 @@ function pcmToWav(pcmData: Uint8Array, sampleRate: number, numChannels: number =
   // Data chunk length
   view.setUint32(40, dataSize, true);
 
-  // Combine header + PCM data
-  const wavFile = new Uint8Array(header.byteLength + pcmData.length);
-  wavFile.set(new Uint8Array(header), 0);
-  wavFile.set(pcmData, header.byteLength);
+  // Append PCM data after the header
+  wavFile.set(pcmData, 44);
 
   return wavFile;
 }
@@ -277,33 +276,37 @@ Deno.serve(async (req) => {
 
     await saveSessionToDatabase(sessionId);
 
-    // Fire-and-forget cleanup operations (non-blocking)
-    // Extract and save lead information from conversation
-    if (session && session.conversationHistory.length > 0) {
-      extractAndSaveLead(session, supabaseClient).catch(err => console.error('[Lead] Background extraction error:', err));
-
-      // Process calendar booking if conversation contains booking intent
-      processCalendarBooking(session, sessionId, supabaseClient).catch(err =>
-        console.error('[Booking] Background booking error:', err)
-      );
-    }
+    // Everything below needs the in-memory session - check for it once
+    if (session) {
+      // Fire-and-forget cleanup operations (non-blocking)
+      // Extract and save lead information from conversation
+      if (session.conversationHistory.length > 0) {
+        const analysisTranscript = buildAnalysisTranscript(session.conversationHistory);
+        extractAndSaveLead(session, supabaseClient, analysisTranscript).catch(err => console.error('[Lead] Background extraction error:', err));
+
+        // Process calendar booking if conversation contains booking intent
+        processCalendarBooking(session, sessionId, supabaseClient, analysisTranscript).catch(err =>
+          console.error('[Booking] Background booking error:', err)
+        );
+      }
 
-    // Track usage event in FlexPrice (for paid plans analytics - future)
-    if (session && session.chatId && session.client.user_id) {
-      const duration = Math.floor((Date.now() - session.startTime) / 1000);
-      trackFlexPriceEvent(session.client.user_id, session.chatId, duration).catch(err =>
-        console.error('[FlexPrice] Background tracking error:', err)
-      );
-    }
+      // Track usage event in FlexPrice (for paid plans analytics - future)
+      if (session.chatId && session.client.user_id) {
+        const duration = Math.floor((Date.now() - session.startTime) / 1000);
+        trackFlexPriceEvent(session.client.user_id, session.chatId, duration).catch(err =>
+          console.error('[FlexPrice] Background tracking error:', err)
+        );
+      }
 
-    if (session?.assemblyaiConnection) {
-      session.assemblyaiConnection.close();
-    }
+      if (session.assemblyaiConnection) {
+        session.assemblyaiConnection.close();
+      }
 
-    // Clear keepalive interval
-    if (session?.keepaliveInterval) {
-      clearInterval(session.keepaliveInterval);
-      console.log('[Keepalive] Interval cleared');
+      // Clear keepalive interval
+      if (session.keepaliveInterval) {
+        clearInterval(session.keepaliveInterval);
+        console.log('[Keepalive] Interval cleared');
+      }
     }
 
     sessions.delete(sessionId);
@@ -844,19 +847,21 @@ function calculateSentimentScore(text: string): number {
   return Math.max(-1, Math.min(1, score)); // Clamp between -1 and 1
 }
 
-function extractTopic(text: string): string {
-  const topics = {
-    'design': ['design', 'branding', 'logo', 'creative'],
-    'web': ['website', 'web', 'development', 'site'],
-    'marketing': ['marketing', 'campaign', 'social'],
-    'pricing': ['price', 'cost', 'quote', 'budget'],
-  };
+// Topic keywords as [topic, keywords] pairs, built once so extractTopic
+// scans a plain array instead of rebuilding and walking an object per call
+const TOPIC_KEYWORDS: Array<[string, string[]]> = [
+  ['design', ['design', 'branding', 'logo', 'creative']],
+  ['web', ['website', 'web', 'development', 'site']],
+  ['marketing', ['marketing', 'campaign', 'social']],
+  ['pricing', ['price', 'cost', 'quote', 'budget']],
+];
 
+function extractTopic(text: string): string {
   const lower = text.toLowerCase();
   let maxCount = 0;
   let topic = 'general';
 
-  for (const [key, keywords] of Object.entries(topics)) {
+  for (const [key, keywords] of TOPIC_KEYWORDS) {
     const count = keywords.filter(k => lower.includes(k)).length;
     if (count > maxCount) {
       maxCount = count;
@@ -917,10 +922,25 @@ Remember: Users are LISTENING, not reading. Speak naturally and concisely.`;
 // LEAD CAPTURE FUNCTIONS
 // ============================================================================
 
+/**
+ * Build the Customer/AI transcript shared by lead and booking extraction
+ * (built once per session end, truncated for Groq's token limits)
+ */
+function buildAnalysisTranscript(messages: any[]): string {
+  const transcript = messages
+    .map((msg: any) => `${msg.role === 'user' ? 'Customer' : 'AI'}: ${msg.content}`)
+    .join('\n');
+
+  const maxLength = 8000; // ~2000 tokens
+  return transcript.length > maxLength
+    ? transcript.substring(0, maxLength) + '...[truncated]'
+    : transcript;
+}
+
 /**
  * Extract lead information from conversation and save to database
  */
-async function extractAndSaveLead(session: any, supabaseClient: any) {
+async function extractAndSaveLead(session: any, supabaseClient: any, truncatedTranscript: string) {
   const GROQ_API_KEY = Deno.env.get('GROQ_API_KEY');
   if (!GROQ_API_KEY) {
     console.log('[Lead Capture] Groq API key not found, skipping lead extraction');
@@ -928,23 +948,12 @@ async function extractAndSaveLead(session: any, supabaseClient: any) {
   }
 
   try {
-    // Build conversation transcript for analysis
-    const transcript = session.conversationHistory
-      .map((msg: any) => `${msg.role === 'user' ? 'Customer' : 'AI'}: ${msg.content}`)
-      .join('\n');
-
     // Validate transcript is not empty
-    if (!transcript || transcript.trim().length === 0) {
+    if (!truncatedTranscript || truncatedTranscript.trim().length === 0) {
       console.log('[Lead Capture] Empty transcript, skipping');
       return;
     }
 
-    // Truncate if too long (Groq has token limits)
-    const maxLength = 8000; // ~2000 tokens
-    const truncatedTranscript = transcript.length > maxLength
-      ? transcript.substring(0, maxLength) + '...[truncated]'
-      : transcript;
-
     console.log('[Lead Capture] Analyzing conversation for lead information...');
 
     // Use LLM to extract lead information
@@ -1055,95 +1064,71 @@ async function trackMinuteUsage(clientId: string, durationSeconds: number, supab
     const minutes = Math.ceil(durationSeconds / 60);
     console.log(`[Minutes] Chat duration: ${durationSeconds}s = ${minutes} minute(s)`);
 
-    // Fetch current client data to check plan status
-    const { data: clientData, error: fetchError } = await supabaseClient
-      .from('voice_ai_clients')
-      .select('client_id, trial_minutes, trial_minutes_used, paid_plan, paid_minutes_used, paid_minutes_included, dodo_customer_id')
-      .eq('client_id', clientId)
-      .single();
+    // Atomically add the minutes to trial or paid usage (single UPDATE ... RETURNING)
+    const { data: clientRows, error: updateError } = await supabaseClient
+      .rpc('increment_minutes_used', {
+        p_client_id: clientId,
+        p_minutes: minutes
+      });
 
-    if (fetchError || !clientData) {
-      console.error('[Minutes] Failed to fetch client data:', fetchError);
+    const clientData = clientRows?.[0];
+
+    if (updateError || !clientData) {
+      console.error('[Minutes] Failed to update minutes used:', updateError);
       return;
     }
 
     // Determine if user is on trial or paid plan
     const isOnTrial = !clientData.paid_plan; // FALSE = trial user
-    const currentMinutesUsed = isOnTrial ? (clientData.trial_minutes_used || 0) : (clientData.paid_minutes_used || 0);
-    const newMinutesUsed = currentMinutesUsed + minutes;
 
     if (isOnTrial) {
-      // Update trial minutes
-      const { error: updateError } = await supabaseClient
-        .from('voice_ai_clients')
-        .update({
-          trial_minutes_used: newMinutesUsed,
-          updated_at: new Date().toISOString()
-        })
-        .eq('client_id', clientId);
-
-      if (updateError) {
-        console.error('[Minutes] Failed to update trial_minutes_used:', updateError);
-      } else {
-        const remaining = (clientData.trial_minutes || 30) - newMinutesUsed;
-        console.log(`[Minutes] ✅ Trial usage updated: ${newMinutesUsed}/${clientData.trial_minutes || 30} minutes (${remaining} remaining)`);
-
-        // Warn if trial is almost exhausted
-        if (remaining <= 5 && remaining > 0) {
-          console.warn(`[Minutes] ⚠️ Trial almost exhausted for ${clientId}: ${remaining} minutes left`);
-        } else if (remaining <= 0) {
-          console.warn(`[Minutes] ⚠️ Trial EXHAUSTED for ${clientId}`);
-        }
+      const newMinutesUsed = clientData.trial_minutes_used || 0;
+      const remaining = (clientData.trial_minutes || 30) - newMinutesUsed;
+      console.log(`[Minutes] ✅ Trial usage updated: ${newMinutesUsed}/${clientData.trial_minutes || 30} minutes (${remaining} remaining)`);
+
+      // Warn if trial is almost exhausted
+      if (remaining <= 5 && remaining > 0) {
+        console.warn(`[Minutes] ⚠️ Trial almost exhausted for ${clientId}: ${remaining} minutes left`);
+      } else if (remaining <= 0) {
+        console.warn(`[Minutes] ⚠️ Trial EXHAUSTED for ${clientId}`);
       }
     } else {
-      // Update paid plan minutes
-      const { error: updateError } = await supabaseClient
-        .from('voice_ai_clients')
-        .update({
-          paid_minutes_used: newMinutesUsed,
-          updated_at: new Date().toISOString()
-        })
-        .eq('client_id', clientId);
-
-      if (updateError) {
-        console.error('[Minutes] Failed to update paid_minutes_used:', updateError);
-      } else {
-        const included = clientData.paid_minutes_included || 0;
-        const remaining = included - newMinutesUsed;
-        const overage = remaining < 0 ? Math.abs(remaining) : 0;
-
-        console.log(`[Minutes] ✅ Paid usage updated: ${newMinutesUsed}/${included} minutes (Paid plan active)`);
+      const newMinutesUsed = clientData.paid_minutes_used || 0;
+      const included = clientData.paid_minutes_included || 0;
+      const remaining = included - newMinutesUsed;
+      const overage = remaining < 0 ? Math.abs(remaining) : 0;
 
-        if (overage > 0) {
-          console.warn(`[Minutes] ⚠️ OVERAGE for ${clientId}: ${overage} minutes over plan limit`);
-        } else if (remaining <= 50) {
-          console.warn(`[Minutes] ⚠️ Plan almost exhausted for ${clientId}: ${remaining} minutes left`);
-        }
+      console.log(`[Minutes] ✅ Paid usage updated: ${newMinutesUsed}/${included} minutes (Paid plan active)`);
 
-        // CRITICAL: Send usage to DodoPayments for overage billing
-        // Only for paid customers with dodo_customer_id
-        if (clientData.paid_plan && clientData.dodo_customer_id) {
-          try {
-            console.log(`[DodoUsage] Sending ${minutes} minutes to DodoPayments for ${clientId}`);
+      if (overage > 0) {
+        console.warn(`[Minutes] ⚠️ OVERAGE for ${clientId}: ${overage} minutes over plan limit`);
+      } else if (remaining <= 50) {
+        console.warn(`[Minutes] ⚠️ Plan almost exhausted for ${clientId}: ${remaining} minutes left`);
+      }
 
-            const { error: ingestError } = await supabaseClient.functions.invoke('ingest-call-usage', {
-              body: {
-                client_id: clientId,
-                minutes_used: minutes
-              }
-            });
+      // CRITICAL: Send usage to DodoPayments for overage billing
+      // Only for paid customers with dodo_customer_id
+      if (clientData.paid_plan && clientData.dodo_customer_id) {
+        try {
+          console.log(`[DodoUsage] Sending ${minutes} minutes to DodoPayments for ${clientId}`);
 
-            if (ingestError) {
-              console.error('[DodoUsage] Failed to send usage to DodoPayments:', ingestError);
-            } else {
-              console.log('[DodoUsage] ✅ Usage sent to DodoPayments successfully');
+          const { error: ingestError } = await supabaseClient.functions.invoke('ingest-call-usage', {
+            body: {
+              client_id: clientId,
+              minutes_used: minutes
             }
-          } catch (error) {
-            console.error('[DodoUsage] Error calling ingest-call-usage:', error);
+          });
+
+          if (ingestError) {
+            console.error('[DodoUsage] Failed to send usage to DodoPayments:', ingestError);
+          } else {
+            console.log('[DodoUsage] ✅ Usage sent to DodoPayments successfully');
           }
-        } else {
-          console.log('[DodoUsage] Skipping - Trial user or no dodo_customer_id');
+        } catch (error) {
+          console.error('[DodoUsage] Error calling ingest-call-usage:', error);
         }
+      } else {
+        console.log('[DodoUsage] Skipping - Trial user or no dodo_customer_id');
       }
     }
 
@@ -1160,7 +1145,7 @@ async function trackMinuteUsage(clientId: string, durationSeconds: number, supab
  * Process calendar booking intent from conversation (runs in background at end of call)
  * Uses separate LLM call to extract booking details, then creates appointment
  */
-async function processCalendarBooking(session: any, sessionId: string, supabaseClient: any): Promise<void> {
+async function processCalendarBooking(session: any, sessionId: string, supabaseClient: any, truncatedTranscript: string): Promise<void> {
   const GROQ_API_KEY = Deno.env.get('GROQ_API_KEY');
   if (!GROQ_API_KEY) {
     console.log('[Booking] Groq API key not found, skipping booking check');
@@ -1168,23 +1153,12 @@ async function processCalendarBooking(session: any, sessionId: string, supabaseC
   }
 
   try {
-    // Build conversation transcript for analysis
-    const transcript = session.conversationHistory
-      .map((msg: any) => `${msg.role === 'user' ? 'Customer' : 'AI'}: ${msg.content}`)
-      .join('\n');
-
     // Validate transcript is not empty
-    if (!transcript || transcript.trim().length === 0) {
+    if (!truncatedTranscript || truncatedTranscript.trim().length === 0) {
       console.log('[Booking] Empty transcript, skipping');
       return;
     }
 
-    // Truncate if too long
-    const maxLength = 8000;
-    const truncatedTranscript = transcript.length > maxLength
-      ? transcript.substring(0, maxLength) + '...[truncated]'
-      : transcript;
-
     console.log('[Booking] Analyzing conversation for booking intent...');
 
     // Use LLM to check if conversation contains booking request
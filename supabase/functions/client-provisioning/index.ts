@@ -10,6 +10,11 @@ const corsHeaders = {
 const FLEXPRICE_API_KEY = Deno.env.get('FLEXPRICE_API_KEY');
 const FLEXPRICE_BASE_URL = Deno.env.get('FLEXPRICE_BASE_URL') || 'https://api.cloud.flexprice.io/v1';
 
+// Public storage locations (fixed per deployment)
+const STORAGE_PUBLIC_URL = `${Deno.env.get('SUPABASE_URL')}/storage/v1/object/public`;
+const AUDIO_SNIPPETS_PUBLIC_URL = `${STORAGE_PUBLIC_URL}/audio-snippets`;
+const WIDGET_SCRIPT_URL = `${STORAGE_PUBLIC_URL}/widgets/klariqo-widget.js`;
+
 interface ClientProvisioningRequest {
   business_name: string;
   region: 'AU' | 'US' | 'UK';
@@ -56,19 +61,72 @@ serve(async (req) => {
       );
     }
 
-    // Step 1: Generate client_id and client_slug
-    const client_id = generateClientId(
+    // Step 1: Generate client_slug and client_id
+    // client_slug is used for URL routing: /region/industry/businessslug
+    const client_slug = generateClientSlug(
       requestData.region,
       requestData.industry,
       requestData.business_name
     );
-
-    // client_slug is used for URL routing: /region/industry/businessslug
-    const client_slug = `${requestData.region.toLowerCase()}_${getIndustryCode(requestData.industry)}_${requestData.business_name.toLowerCase().replace(/[^a-z0-9]/g, '').substring(0, 20)}`;
+    const client_id = generateClientId(client_slug);
 
     console.log('[ClientProvisioning] Generated client_id:', client_id);
     console.log('[ClientProvisioning] Generated client_slug:', client_slug);
 
+    // Intro audio file names and public URLs (derived once from client_id)
+    const audioFileName_ulaw = `${client_id}_intro.ulaw`;
+    const audioFileName_mp3 = `${client_id}_intro.mp3`;
+    const audio_url_ulaw = `${AUDIO_SNIPPETS_PUBLIC_URL}/${audioFileName_ulaw}`;
+    const audio_url_mp3 = `${AUDIO_SNIPPETS_PUBLIC_URL}/${audioFileName_mp3}`;
+
+    // Idempotent retries: if this user already owns the client, return it
+    // instead of re-generating audio and failing on the duplicate insert
+    const { data: existingClient } = await supabaseClient
+      .from('voice_ai_clients')
+      .select('client_id, client_slug, user_id, channel_type, business_name, phone_number, voice_id')
+      .eq('client_id', client_id)
+      .maybeSingle();
+
+    if (existingClient && existingClient.user_id === requestData.user_id) {
+      console.log('[ClientProvisioning] Client already provisioned, returning existing record:', client_id);
+
+      const existingResponse: any = {
+        success: true,
+        client_id: existingClient.client_id,
+        client_slug: existingClient.client_slug,
+        channel_type: existingClient.channel_type,
+        business_name: existingClient.business_name,
+        phone_number: existingClient.phone_number,
+        voice_id: existingClient.voice_id,
+        intro_audio_file_ulaw: audioFileName_ulaw,
+        intro_audio_file_mp3: audioFileName_mp3,
+        audio_url_ulaw: audio_url_ulaw,
+        audio_url_mp3: audio_url_mp3,
+        already_provisioned: true,
+        message: 'Client already provisioned',
+      };
+
+      if (existingClient.channel_type === 'website' || existingClient.channel_type === 'both') {
+        const { data: existingWidget } = await supabaseClient
+          .from('widget_config')
+          .select('embed_code')
+          .eq('client_id', client_id)
+          .maybeSingle();
+
+        if (existingWidget?.embed_code) {
+          existingResponse.embed_code = existingWidget.embed_code;
+        }
+      }
+
+      return new Response(
+        JSON.stringify(existingResponse),
+        {
+          status: 200,
+          headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        }
+      );
+    }
+
     // Step 2: Get voice_id (use provided or default based on region)
     const voice_id = requestData.voice_id || getDefaultVoiceId(requestData.region);
     console.log('[ClientProvisioning] Using voice_id:', voice_id);
@@ -88,18 +146,18 @@ serve(async (req) => {
 
     // Step 5: Generate intro audio with ElevenLabs (BOTH formats)
     console.log('[ClientProvisioning] Generating intro audio with ElevenLabs...');
-    const audioFileName_ulaw = `${client_id}_intro.ulaw`;
-    const audioFileName_mp3 = `${client_id}_intro.mp3`;
 
-    // Generate μ-law for phone calls
-    const audioBuffer_ulaw = await generateIntroAudio(greeting_text, voice_id, 'ulaw_8000');
+    // Generate μ-law for phone calls and MP3 for website widget concurrently
+    const [audioBuffer_ulaw, audioBuffer_mp3] = await Promise.all([
+      generateIntroAudio(greeting_text, voice_id, 'ulaw_8000'),
+      generateIntroAudio(greeting_text, voice_id, 'mp3_44100'),
+    ]);
+
     if (!audioBuffer_ulaw) {
       throw new Error('Failed to generate ulaw intro audio');
     }
     console.log(`[ClientProvisioning] Generated ulaw audio: ${audioBuffer_ulaw.byteLength} bytes`);
 
-    // Generate MP3 for website widget
-    const audioBuffer_mp3 = await generateIntroAudio(greeting_text, voice_id, 'mp3_44100');
     if (!audioBuffer_mp3) {
       throw new Error('Failed to generate mp3 intro audio');
     }
@@ -108,13 +166,24 @@ serve(async (req) => {
     // Step 6: Upload BOTH to Supabase Storage
     console.log('[ClientProvisioning] Uploading audio files to Supabase Storage...');
 
-    // Upload ulaw (phone)
-    const { data: uploadData, error: uploadError } = await supabaseClient.storage
-      .from('audio-snippets')
-      .upload(audioFileName_ulaw, audioBuffer_ulaw, {
-        contentType: 'audio/basic',
-        upsert: true,
-      });
+    // Upload ulaw (phone) and mp3 (website) concurrently - independent objects
+    const [
+      { data: uploadData, error: uploadError },
+      { data: uploadData_mp3, error: uploadError_mp3 },
+    ] = await Promise.all([
+      supabaseClient.storage
+        .from('audio-snippets')
+        .upload(audioFileName_ulaw, audioBuffer_ulaw, {
+          contentType: 'audio/basic',
+          upsert: true,
+        }),
+      supabaseClient.storage
+        .from('audio-snippets')
+        .upload(audioFileName_mp3, audioBuffer_mp3, {
+          contentType: 'audio/mpeg',
+          upsert: true,
+        }),
+    ]);
 
     if (uploadError) {
       console.error('[ClientProvisioning] Upload error (ulaw):', uploadError);
@@ -122,14 +191,6 @@ serve(async (req) => {
     }
     console.log('[ClientProvisioning] ✅ Ulaw audio uploaded:', uploadData);
 
-    // Upload mp3 (website)
-    const { data: uploadData_mp3, error: uploadError_mp3 } = await supabaseClient.storage
-      .from('audio-snippets')
-      .upload(audioFileName_mp3, audioBuffer_mp3, {
-        contentType: 'audio/mpeg',
-        upsert: true,
-      });
-
     if (uploadError_mp3) {
       console.error('[ClientProvisioning] Upload error (mp3):', uploadError_mp3);
       throw new Error(`MP3 storage upload failed: ${uploadError_mp3.message}`);
@@ -142,11 +203,7 @@ serve(async (req) => {
     const channel_type = requestData.channel_type || 'phone';
 
     // Calculate timezone based on region
-    const timezone = requestData.region === 'AU' ? 'Australia/Sydney'
-                   : requestData.region === 'UK' ? 'Europe/London'
-                   : requestData.region === 'CA' ? 'America/Toronto'
-                   : requestData.region === 'IN' ? 'Asia/Kolkata'
-                   : 'America/New_York';
+    const timezone = REGION_TIMEZONES[requestData.region] || 'America/New_York';
 
     // Default business hours (can be customized later in Business Details page)
     const business_hours = {
@@ -168,6 +225,9 @@ serve(async (req) => {
 
     console.log(`[ClientProvisioning] Trial allocation: ${trial_minutes} minutes (universal for all channels)`);
 
+    // One timestamp for every row created by this provisioning run
+    const provisionedAt = new Date().toISOString();
+
     const { data: clientData, error: clientError} = await supabaseClient
       .from('voice_ai_clients')
       .insert({
@@ -189,7 +249,7 @@ serve(async (req) => {
         // Minute-based trial tracking (Nov 1, 2025)
         trial_minutes: trial_minutes,
         trial_minutes_used: trial_minutes_used,
-        created_at: new Date().toISOString(),
+        created_at: provisionedAt,
         // NEW: Business context fields
         website_url: requestData.website_url || null,
         services_offered: requestData.services_offered || [],
@@ -207,94 +267,106 @@ serve(async (req) => {
 
     console.log('[ClientProvisioning] Client created:', clientData);
 
-    // Step 8: FlexPrice Integration - Create customer and wallet
-    console.log('[ClientProvisioning] Creating FlexPrice customer and wallet...');
+    // Steps 8-10 are independent and non-fatal (the client row already exists),
+    // so run them concurrently instead of serializing their round trips
+    const channelHasWidget = channel_type === 'website' || channel_type === 'both';
 
-    // Get user email from Supabase Auth
-    const { data: userData, error: userError } = await supabaseClient.auth.admin.getUserById(requestData.user_id);
-    const userEmail = userData?.user?.email || `${requestData.user_id}@klariqo.com`; // Fallback email
+    // Generate embed code
+    const widget_url = WIDGET_SCRIPT_URL;
+    const embed_code = channelHasWidget
+      ? `<script src="${widget_url}?client_id=${client_id}"></script>`
+      : null;
 
-    if (userError) {
-      console.warn('[ClientProvisioning] Could not fetch user email:', userError.message);
-    }
+    // Step 8: FlexPrice Integration - Create customer and wallet
+    const setupFlexPrice = async () => {
+      console.log('[ClientProvisioning] Creating FlexPrice customer and wallet...');
 
-    // Create FlexPrice customer (per-client, not per-user)
-    // This ensures each business has separate billing
-    const customerCreated = await createFlexPriceCustomer(
-      client_id,  // Use client_id instead of user_id for per-business billing
-      userEmail,
-      requestData.business_name
-    );
+      // Get user email from Supabase Auth
+      const { data: userData, error: userError } = await supabaseClient.auth.admin.getUserById(requestData.user_id);
+      const userEmail = userData?.user?.email || `${requestData.user_id}@klariqo.com`; // Fallback email
 
-    if (customerCreated) {
-      // Create wallet with 10 free trial credits (per-client wallet)
-      await createFlexPriceWallet(client_id, 10);  // Use client_id for per-business credits
-    } else {
-      console.warn('[ClientProvisioning] ⚠️ FlexPrice customer creation failed - continuing anyway');
-      // Non-fatal - client is already created, we can retry later
-    }
+      if (userError) {
+        console.warn('[ClientProvisioning] Could not fetch user email:', userError.message);
+      }
 
-    // Step 9: Insert into audio_files table (both formats)
-    console.log('[ClientProvisioning] Creating audio_files records...');
+      // Create FlexPrice customer (per-client, not per-user)
+      // This ensures each business has separate billing
+      const customerCreated = await createFlexPriceCustomer(
+        client_id,  // Use client_id instead of user_id for per-business billing
+        userEmail,
+        requestData.business_name
+      );
 
-    // Insert ulaw record
-    const { data: audioFileData_ulaw, error: audioFileError_ulaw } = await supabaseClient
-      .from('audio_files')
-      .insert({
-        client_id: client_id,
-        file_name: audioFileName_ulaw,
-        file_path: `audio-snippets/${audioFileName_ulaw}`,
-        file_type: 'intro',
-        audio_format: 'ulaw',
-        sample_rate: 8000,
-        duration_ms: Math.round((audioBuffer_ulaw.byteLength / 8000) * 1000),
-        file_size_bytes: audioBuffer_ulaw.byteLength,
-        created_at: new Date().toISOString(),
-      })
-      .select()
-      .single();
+      if (customerCreated) {
+        // Create wallet with 10 free trial credits (per-client wallet)
+        await createFlexPriceWallet(client_id, 10);  // Use client_id for per-business credits
+      } else {
+        console.warn('[ClientProvisioning] ⚠️ FlexPrice customer creation failed - continuing anyway');
+        // Non-fatal - client is already created, we can retry later
+      }
+    };
 
-    if (audioFileError_ulaw) {
-      console.error('[ClientProvisioning] Audio file insert error (ulaw):', audioFileError_ulaw);
-    } else {
-      console.log('[ClientProvisioning] Ulaw audio file record created:', audioFileData_ulaw);
-    }
+    // Step 9: Insert into audio_files table (both formats)
+    const insertAudioFiles = async () => {
+      console.log('[ClientProvisioning] Creating audio_files records...');
+
+      const [
+        { data: audioFileData_ulaw, error: audioFileError_ulaw },
+        { data: audioFileData_mp3, error: audioFileError_mp3 },
+      ] = await Promise.all([
+        // Insert ulaw record
+        supabaseClient
+          .from('audio_files')
+          .insert({
+            client_id: client_id,
+            file_name: audioFileName_ulaw,
+            file_path: `audio-snippets/${audioFileName_ulaw}`,
+            file_type: 'intro',
+            audio_format: 'ulaw',
+            sample_rate: 8000,
+            duration_ms: Math.round((audioBuffer_ulaw.byteLength / 8000) * 1000),
+            file_size_bytes: audioBuffer_ulaw.byteLength,
+            created_at: provisionedAt,
+          })
+          .select()
+          .single(),
+        // Insert mp3 record
+        supabaseClient
+          .from('audio_files')
+          .insert({
+            client_id: client_id,
+            file_name: audioFileName_mp3,
+            file_path: `audio-snippets/${audioFileName_mp3}`,
+            file_type: 'intro',
+            audio_format: 'mp3',
+            sample_rate: 44100,
+            duration_ms: Math.round((audioBuffer_mp3.byteLength / 176400) * 1000), // 44100 * 4 bytes/sample
+            file_size_bytes: audioBuffer_mp3.byteLength,
+            created_at: provisionedAt,
+          })
+          .select()
+          .single(),
+      ]);
+
+      if (audioFileError_ulaw) {
+        console.error('[ClientProvisioning] Audio file insert error (ulaw):', audioFileError_ulaw);
+      } else {
+        console.log('[ClientProvisioning] Ulaw audio file record created:', audioFileData_ulaw);
+      }
 
-    // Insert mp3 record
-    const { data: audioFileData_mp3, error: audioFileError_mp3 } = await supabaseClient
-      .from('audio_files')
-      .insert({
-        client_id: client_id,
-        file_name: audioFileName_mp3,
-        file_path: `audio-snippets/${audioFileName_mp3}`,
-        file_type: 'intro',
-        audio_format: 'mp3',
-        sample_rate: 44100,
-        duration_ms: Math.round((audioBuffer_mp3.byteLength / 176400) * 1000), // 44100 * 4 bytes/sample
-        file_size_bytes: audioBuffer_mp3.byteLength,
-        created_at: new Date().toISOString(),
-      })
-      .select()
-      .single();
+      if (audioFileError_mp3) {
+        console.error('[ClientProvisioning] Audio file insert error (mp3):', audioFileError_mp3);
+      } else {
+        console.log('[ClientProvisioning] MP3 audio file record created:', audioFileData_mp3);
+      }
+    };
 
-    if (audioFileError_mp3) {
-      console.error('[ClientProvisioning] Audio file insert error (mp3):', audioFileError_mp3);
-    } else {
-      console.log('[ClientProvisioning] MP3 audio file record created:', audioFileData_mp3);
-    }
+    // Step 10: Create widget_config if channel_type is 'website' or 'both'
+    const insertWidgetConfig = async () => {
+      if (!channelHasWidget) return;
 
-    // Step 9: Create widget_config if channel_type is 'website' or 'both'
-    let embed_code = null;
-    if (channel_type === 'website' || channel_type === 'both') {
       console.log('[ClientProvisioning] Creating widget_config for website channel...');
 
-      // Generate embed code
-      const widget_url = `${Deno.env.get('SUPABASE_URL')}/storage/v1/object/public/widgets/klariqo-widget.js`;
-      embed_code = `<script src="${widget_url}?client_id=${client_id}"></script>`;
-
-      // Generate MP3 audio URL for widget
-      const mp3_audio_url = `${Deno.env.get('SUPABASE_URL')}/storage/v1/object/public/audio-snippets/${audioFileName_mp3}`;
-
       const { data: widgetData, error: widgetError } = await supabaseClient
         .from('widget_config')
         .insert({
@@ -305,7 +377,7 @@ serve(async (req) => {
           position: 'bottom-right',
           widget_size: 'medium',
           greeting_message: greeting_text,
-          greeting_audio_url: mp3_audio_url,  // Pre-generated MP3 intro
+          greeting_audio_url: audio_url_mp3,  // Pre-generated MP3 intro
           system_prompt: system_prompt,
           embed_code: embed_code,
           widget_url: widget_url,
@@ -319,7 +391,9 @@ serve(async (req) => {
       } else {
         console.log('[ClientProvisioning] Widget config created:', widgetData);
       }
-    }
+    };
+
+    await Promise.all([setupFlexPrice(), insertAudioFiles(), insertWidgetConfig()]);
 
     // Success response
     const responseData: any = {
@@ -332,8 +406,8 @@ serve(async (req) => {
       voice_id: voice_id,
       intro_audio_file_ulaw: audioFileName_ulaw,
       intro_audio_file_mp3: audioFileName_mp3,
-      audio_url_ulaw: `${Deno.env.get('SUPABASE_URL')}/storage/v1/object/public/audio-snippets/${audioFileName_ulaw}`,
-      audio_url_mp3: `${Deno.env.get('SUPABASE_URL')}/storage/v1/object/public/audio-snippets/${audioFileName_mp3}`,
+      audio_url_ulaw: audio_url_ulaw,
+      audio_url_mp3: audio_url_mp3,
       message: 'Client provisioned successfully',
     };
 
@@ -362,9 +436,9 @@ serve(async (req) => {
   }
 });
 
-// Helper: Generate client_id from region, industry, and business name
-// Format: {region}_{industry_code}_{business_slug}_001
-function generateClientId(region: string, industry: string, businessName: string): string {
+// Helper: Generate client_slug from region, industry, and business name
+// Format: {region}_{industry_code}_{business_slug}
+function generateClientSlug(region: string, industry: string, businessName: string): string {
   const regionCode = region.toLowerCase();
   const industryCode = getIndustryCode(industry);
   const businessSlug = businessName
@@ -372,108 +446,124 @@ function generateClientId(region: string, industry: string, businessName: string
     .replace(/[^a-z0-9]/g, '')
     .substring(0, 20);
 
+  return `${regionCode}_${industryCode}_${businessSlug}`;
+}
+
+// Helper: Generate client_id from the client_slug (normalized once, shared by both)
+// Format: {region}_{industry_code}_{business_slug}_001
+function generateClientId(clientSlug: string): string {
   // Generate sequence number (001, 002, etc.) - for now, just use 001
   // In production, you'd query the database to find the next available number
   const sequence = '001';
 
-  return `${regionCode}_${industryCode}_${businessSlug}_${sequence}`;
+  return `${clientSlug}_${sequence}`;
 }
 
+// Industry -> 4-letter code (built once per isolate, not per call)
+const INDUSTRY_CODES: { [key: string]: string } = {
+  // Physical/Local Services
+  'plumbing': 'plmb',
+  'hvac': 'hvac',
+  'electrical': 'elec',
+  'electrician': 'elec',
+  'landscaping': 'land',
+  'lawn': 'land',
+  'cleaning': 'clen',
+  'roofing': 'roof',
+  'painting': 'pant',
+  'carpentry': 'carp',
+  'pest_control': 'pest',
+  'pest': 'pest',
+  'locksmith': 'lock',
+  'handyman': 'hand',
+
+  // Online Businesses
+  'saas': 'saas',
+  'software': 'saas',
+  'software_as_a_service': 'saas',
+  'ecommerce': 'ecom',
+  'e-commerce': 'ecom',
+  'e_commerce': 'ecom',
+  'online_store': 'ecom',
+  'online_shop': 'ecom',
+  'blog': 'blog',
+  'blogging': 'blog',
+  'content': 'blog',
+  'consulting': 'cons',
+  'consultant': 'cons',
+  'consultancy': 'cons',
+  'marketing': 'mark',
+  'marketing_agency': 'mark',
+  'agency': 'mark',
+  'design': 'desi',
+  'design_agency': 'desi',
+  'creative': 'desi',
+  'creative_agency': 'desi',
+
+  // Professional Services
+  'healthcare': 'hlth',
+  'health': 'hlth',
+  'medical': 'hlth',
+  'dental': 'hlth',
+  'dentist': 'hlth',
+  'real_estate': 'real',
+  'realestate': 'real',
+  'property': 'real',
+  'legal': 'legl',
+  'law': 'legl',
+  'lawyer': 'legl',
+  'attorney': 'legl',
+
+  // Food & Hospitality
+  'restaurant': 'rest',
+  'food': 'rest',
+  'cafe': 'cafe',
+  'coffee': 'cafe',
+  'bar': 'rest',
+};
+
 // Helper: Map industry to 4-letter code
 function getIndustryCode(industry: string): string {
-  const industryMap: { [key: string]: string } = {
-    // Physical/Local Services
-    'plumbing': 'plmb',
-    'hvac': 'hvac',
-    'electrical': 'elec',
-    'electrician': 'elec',
-    'landscaping': 'land',
-    'lawn': 'land',
-    'cleaning': 'clen',
-    'roofing': 'roof',
-    'painting': 'pant',
-    'carpentry': 'carp',
-    'pest_control': 'pest',
-    'pest': 'pest',
-    'locksmith': 'lock',
-    'handyman': 'hand',
-
-    // Online Businesses
-    'saas': 'saas',
-    'software': 'saas',
-    'software_as_a_service': 'saas',
-    'ecommerce': 'ecom',
-    'e-commerce': 'ecom',
-    'e_commerce': 'ecom',
-    'online_store': 'ecom',
-    'online_shop': 'ecom',
-    'blog': 'blog',
-    'blogging': 'blog',
-    'content': 'blog',
-    'consulting': 'cons',
-    'consultant': 'cons',
-    'consultancy': 'cons',
-    'marketing': 'mark',
-    'marketing_agency': 'mark',
-    'agency': 'mark',
-    'design': 'desi',
-    'design_agency': 'desi',
-    'creative': 'desi',
-    'creative_agency': 'desi',
-
-    // Professional Services
-    'healthcare': 'hlth',
-    'health': 'hlth',
-    'medical': 'hlth',
-    'dental': 'hlth',
-    'dentist': 'hlth',
-    'real_estate': 'real',
-    'realestate': 'real',
-    'property': 'real',
-    'legal': 'legl',
-    'law': 'legl',
-    'lawyer': 'legl',
-    'attorney': 'legl',
-
-    // Food & Hospitality
-    'restaurant': 'rest',
-    'food': 'rest',
-    'cafe': 'cafe',
-    'coffee': 'cafe',
-    'bar': 'rest',
-  };
-
   const normalized = industry.toLowerCase().replace(/\s+/g, '_').replace(/-/g, '_');
-  return industryMap[normalized] || 'misc'; // Default to 'misc' for miscellaneous
+  return INDUSTRY_CODES[normalized] || 'misc'; // Default to 'misc' for miscellaneous
 }
 
+// Default business timezone per region (anything else falls back to US Eastern)
+const REGION_TIMEZONES: { [key: string]: string } = {
+  'AU': 'Australia/Sydney',
+  'UK': 'Europe/London',
+  'CA': 'America/Toronto',
+  'IN': 'Asia/Kolkata',
+};
+
+// Default ElevenLabs voice per region
+const DEFAULT_VOICE_IDS: { [key: string]: string } = {
+  'AU': 'G83AhxHK8kccx46W4Tcd', // Male Australian voice
+  'US': 'pNInz6obpgDQGcFmaJgB', // Male US voice (Adam)
+  'UK': 'ThT5KcBeYPX3keUQqHPh', // Male UK voice (Antoni)
+  'CA': 'pNInz6obpgDQGcFmaJgB', // Male Canadian voice (same as US - Adam)
+};
+
 // Helper: Get default voice_id based on region
 function getDefaultVoiceId(region: string): string {
-  const voiceMap: { [key: string]: string } = {
-    'AU': 'G83AhxHK8kccx46W4Tcd', // Male Australian voice
-    'US': 'pNInz6obpgDQGcFmaJgB', // Male US voice (Adam)
-    'UK': 'ThT5KcBeYPX3keUQqHPh', // Male UK voice (Antoni)
-    'CA': 'pNInz6obpgDQGcFmaJgB', // Male Canadian voice (same as US - Adam)
-  };
-
-  return voiceMap[region] || voiceMap['US']; // Default to US voice
+  return DEFAULT_VOICE_IDS[region] || DEFAULT_VOICE_IDS['US']; // Default to US voice
 }
 
+// Greeting templates per region - only the selected one is rendered
+const GREETING_TEMPLATES: { [key: string]: (businessName: string) => string } = {
+  'AU': (businessName) => `G'day! Thanks for calling ${businessName}. How can I help you today?`,
+  'US': (businessName) => `Hi there! Thanks for calling ${businessName}. How can I assist you today?`,
+  'UK': (businessName) => `Hello! Thanks for calling ${businessName}. How may I help you today?`,
+};
+
 // Helper: Generate greeting based on region and business name
 function generateGreeting(region: string, businessName: string): string {
-  const greetingMap: { [key: string]: string } = {
-    'AU': `G'day! Thanks for calling ${businessName}. How can I help you today?`,
-    'US': `Hi there! Thanks for calling ${businessName}. How can I assist you today?`,
-    'UK': `Hello! Thanks for calling ${businessName}. How may I help you today?`,
-  };
-
-  return greetingMap[region] || greetingMap['US'];
+  return (GREETING_TEMPLATES[region] || GREETING_TEMPLATES['US'])(businessName);
 }
 
-// Helper: Generate system prompt based on industry
-function generateSystemPrompt(industry: string, businessName: string): string {
-  const industryPrompts: { [key: string]: string } = {
-    'plumbing': `You are a friendly and professional receptionist for ${businessName}, a plumbing company. Your role is to:
+// System prompt templates per industry - only the selected one is rendered
+const INDUSTRY_PROMPT_TEMPLATES: { [key: string]: (businessName: string) => string } = {
+  'plumbing': (businessName) => `You are a friendly and professional receptionist for ${businessName}, a plumbing company. Your role is to:
 - Greet callers warmly
 - Understand their plumbing issue (leaks, blockages, installations, emergencies)
 - Collect basic information (name, phone, address, issue description)
@@ -483,7 +573,7 @@ function generateSystemPrompt(industry: string, businessName: string): string {
 
 Keep responses natural, concise, and helpful. Ask one question at a time.`,
 
-    'hvac': `You are a friendly and professional receptionist for ${businessName}, an HVAC company. Your role is to:
+  'hvac': (businessName) => `You are a friendly and professional receptionist for ${businessName}, an HVAC company. Your role is to:
 - Greet callers warmly
 - Understand their heating/cooling issue
 - Collect basic information (name, phone, address, system type, issue)
@@ -493,7 +583,7 @@ Keep responses natural, concise, and helpful. Ask one question at a time.`,
 
 Keep responses natural, concise, and helpful.`,
 
-    'default': `You are a friendly and professional receptionist for ${businessName}. Your role is to:
+  'default': (businessName) => `You are a friendly and professional receptionist for ${businessName}. Your role is to:
 - Greet callers warmly
 - Understand their needs
 - Collect basic information (name, phone, inquiry details)
@@ -501,10 +591,12 @@ Keep responses natural, concise, and helpful.`,
 - Provide helpful information about services
 
 Keep responses natural, concise, and helpful.`,
-  };
+};
 
+// Helper: Generate system prompt based on industry
+function generateSystemPrompt(industry: string, businessName: string): string {
   const normalized = industry.toLowerCase();
-  return industryPrompts[normalized] || industryPrompts['default'];
+  return (INDUSTRY_PROMPT_TEMPLATES[normalized] || INDUSTRY_PROMPT_TEMPLATES['default'])(businessName);
 }
 
 // Helper: Generate intro audio using ElevenLabs streaming API
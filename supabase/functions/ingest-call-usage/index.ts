@@ -5,6 +5,8 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+const jsonHeaders = { ...corsHeaders, 'Content-Type': 'application/json' };
+
 const DODO_METER_ID = 'mtr_uaY8t2CPrkBHCJVvVAqeU'; // LIVE meter ID
 
 Deno.serve(async (req) => {
@@ -28,7 +30,7 @@ Deno.serve(async (req) => {
     if (!client_id || !minutes_used) {
       return new Response(
         JSON.stringify({ error: 'Missing required fields: client_id, minutes_used' }),
-        { status: 400, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+        { status: 400, headers: jsonHeaders }
       );
     }
 
@@ -43,7 +45,7 @@ Deno.serve(async (req) => {
       console.error('[IngestCallUsage] Client not found:', clientError);
       return new Response(
         JSON.stringify({ error: 'Client not found' }),
-        { status: 404, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+        { status: 404, headers: jsonHeaders }
       );
     }
 
@@ -51,7 +53,7 @@ Deno.serve(async (req) => {
       console.warn('[IngestCallUsage] Client has no dodo_customer_id, skipping usage ingestion');
       return new Response(
         JSON.stringify({ message: 'No active subscription, usage not tracked' }),
-        { status: 200, headers: { ...corsHeaders, 'Content-Type': 'application/json' } }
+        { status: 200, headers: jsonHeaders }
       );
     }
 
@@ -67,7 +69,7 @@ Deno.serve(async (req) => {
       timestamp: new Date().toISOString()
     };
 
-    console.log('[IngestCallUsage] DodoPayments usage request:', JSON.stringify(usageRequest, null, 2));
+    console.log('[IngestCallUsage] DodoPayments usage request:', JSON.stringify(usageRequest));
 
     // Use live.dodopayments.com for production
     const apiUrl = 'https://live.dodopayments.com/events/ingest';
@@ -90,7 +92,7 @@ Deno.serve(async (req) => {
 
     const responseData = await response.json();
     console.log('[IngestCallUsage] ✅ Usage ingested successfully');
-    console.log('[IngestCallUsage] Response:', JSON.stringify(responseData, null, 2));
+    console.log('[IngestCallUsage] Response:', JSON.stringify(responseData));
 
     // Return success
     return new Response(
@@ -101,7 +103,7 @@ Deno.serve(async (req) => {
       }),
       {
         status: 200,
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' }
+        headers: jsonHeaders
       }
     );
 
@@ -113,7 +115,7 @@ Deno.serve(async (req) => {
       }),
       {
         status: 500,
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' }
+        headers: jsonHeaders
       }
     );
   }
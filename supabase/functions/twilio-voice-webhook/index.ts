@@ -1,4 +1,3 @@
-import "https://deno.land/x/xhr@0.1.0/mod.ts";
 import { createClient } from "https://esm.sh/@supabase/supabase-js@2";
 import { buildVoiceOptimizedPrompt, normalizeForTTS } from "../_shared/voice-utils.ts";
 
@@ -11,6 +10,21 @@ const corsHeaders = {
 const FLEXPRICE_API_KEY = Deno.env.get('FLEXPRICE_API_KEY');
 const FLEXPRICE_BASE_URL = Deno.env.get('FLEXPRICE_BASE_URL') || 'https://api.cloud.flexprice.io/v1';
 
+// Supabase + provider configuration (read once per isolate, not per call/turn)
+const SUPABASE_URL = Deno.env.get('SUPABASE_URL') ?? '';
+const SUPABASE_SERVICE_ROLE_KEY = Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? '';
+const AUDIO_SNIPPETS_BASE_URL = `${SUPABASE_URL}/storage/v1/object/public/audio-snippets`;
+const ASSEMBLYAI_API_KEY = Deno.env.get('ASSEMBLYAI_API_KEY');
+const GROQ_API_KEY = Deno.env.get('GROQ_API_KEY');
+const ELEVENLABS_API_KEY = Deno.env.get('ELEVENLABS_API_KEY');
+
+// Per-chunk audio diagnostics (byte counts, header hex dumps) are opt-in
+const DEBUG_LOGS = Deno.env.get('DEBUG_LOGS') === 'true';
+
+// One Supabase client per isolate, shared by every call's session - fetch keeps
+// the connection pooled instead of each call starting from a fresh client
+const supabaseClient = createClient(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY);
+
 interface TwilioVoiceSession {
   client: any;
   voiceProfile: any; // Voice profile from voice_profiles table
@@ -21,7 +35,7 @@ interface TwilioVoiceSession {
   conversationHistory: Array<{ role: string; content: string }>;
   conversationLog: Array<{ speaker: string; content: string; timestamp: string; message_type: string }>;
   assemblyaiConnection: WebSocket | null;
-  sessionStartTime: number;
+  sessionStartTime: number; // performance.now() mark - only used for the call duration
   isProcessing: boolean; // GPT is processing user input
   isSpeaking: boolean; // AI audio is currently playing
   currentAudioMark: string | null; // Track which audio chunk is playing
@@ -29,7 +43,11 @@ interface TwilioVoiceSession {
   // Keepalive timer for Supabase
   supabaseKeepaliveTimer: number | null;
   // AssemblyAI audio buffer (REQUIRED: Twilio sends 20ms, AssemblyAI needs 50-1000ms)
-  assemblyaiBuffer: Uint8Array[];
+  assemblyaiBuffer: string[]; // Decoded (binary string) Twilio payloads awaiting one combined send
+  // System prompt cache - the prompt only changes when the clock minute or voice profile does
+  systemPrompt: string | null;
+  systemPromptMinute: number;
+  systemPromptProfile: any;
 }
 
 const sessions = new Map<string, TwilioVoiceSession>();
@@ -46,16 +64,19 @@ Deno.serve(async (req) => {
   // ========================================
   console.log(`[Twilio] ========================================`);
   console.log(`[Twilio] NEW CONNECTION ATTEMPT`);
-  console.log(`[Twilio] Timestamp: ${new Date().toISOString()}`);
   console.log(`[Twilio] Full URL: ${req.url}`);
   console.log(`[Twilio] Method: ${req.method}`);
 
-  // Log all headers
-  const headerObj: Record<string, string> = {};
-  headers.forEach((value, key) => {
-    headerObj[key] = value;
-  });
-  console.log(`[Twilio] Headers:`, JSON.stringify(headerObj, null, 2));
+  // Log all headers (edge runtime logs are already timestamped, so the
+  // explicit timestamp only comes with the full dump)
+  if (DEBUG_LOGS) {
+    console.log(`[Twilio] Timestamp: ${new Date().toISOString()}`);
+    const headerObj: Record<string, string> = {};
+    headers.forEach((value, key) => {
+      headerObj[key] = value;
+    });
+    console.log(`[Twilio] Headers:`, JSON.stringify(headerObj));
+  }
 
   const upgradeHeader = headers.get("upgrade") || "";
   console.log(`[Twilio] Upgrade header: "${upgradeHeader}"`);
@@ -70,16 +91,11 @@ Deno.serve(async (req) => {
   const { socket, response } = Deno.upgradeWebSocket(req);
   console.log(`[Twilio] ✅ WebSocket upgraded successfully`);
 
-  const supabaseClient = createClient(
-    Deno.env.get('SUPABASE_URL') ?? '',
-    Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
-  );
-
   const url = new URL(req.url);
-  const pathParts = url.pathname.split('/');
-  const callSid = pathParts[pathParts.length - 1];
+  // callSid is the last path segment - slice it out without splitting the path
+  const callSid = url.pathname.slice(url.pathname.lastIndexOf('/') + 1);
 
-  console.log(`[Twilio] Path segments:`, pathParts);
+  console.log(`[Twilio] Path: ${url.pathname}`);
   console.log(`[Twilio] Extracted callSid: "${callSid}"`);
 
   if (!callSid) {
@@ -124,14 +140,20 @@ Deno.serve(async (req) => {
   return response;
 });
 
-async function initializeAssemblyAI(callSid: string, twilioSocket: WebSocket): Promise<boolean> {
-  const session = sessions.get(callSid);
-  if (!session) return false;
+interface AssemblyAIConnection {
+  ws: WebSocket;
+  opened: Promise<boolean>;
+}
 
-  const ASSEMBLYAI_API_KEY = Deno.env.get('ASSEMBLYAI_API_KEY');
+/**
+ * Start the AssemblyAI streaming handshake. Split out from initializeAssemblyAI
+ * so the TLS + WebSocket setup can overlap the client lookup in the start event
+ * instead of beginning only after it.
+ */
+function connectAssemblyAI(): AssemblyAIConnection | null {
   if (!ASSEMBLYAI_API_KEY) {
     console.error('[AssemblyAI] API key not configured');
-    return false;
+    return null;
   }
 
   try {
@@ -151,7 +173,7 @@ async function initializeAssemblyAI(callSid: string, twilioSocket: WebSocket): P
       `wss://streaming.assemblyai.com/v3/ws?${params}`
     );
 
-    const connectionPromise = new Promise<boolean>((resolve) => {
+    const opened = new Promise<boolean>((resolve) => {
       const timeout = setTimeout(() => {
         console.error('[AssemblyAI] Connection timeout');
         resolve(false);
@@ -160,7 +182,6 @@ async function initializeAssemblyAI(callSid: string, twilioSocket: WebSocket): P
       assemblyaiWs.onopen = () => {
         clearTimeout(timeout);
         console.log('[AssemblyAI] Connected (μ-law 8kHz for Twilio)');
-        session.assemblyaiConnection = assemblyaiWs;
         resolve(true);
       };
 
@@ -171,6 +192,24 @@ async function initializeAssemblyAI(callSid: string, twilioSocket: WebSocket): P
       };
     });
 
+    return { ws: assemblyaiWs, opened };
+  } catch (error) {
+    console.error('[AssemblyAI] Connection error:', error);
+    return null;
+  }
+}
+
+async function initializeAssemblyAI(
+  callSid: string,
+  twilioSocket: WebSocket,
+  connection: AssemblyAIConnection | null
+): Promise<boolean> {
+  const session = sessions.get(callSid);
+  if (!session || !connection) return false;
+
+  try {
+    const assemblyaiWs = connection.ws;
+
     assemblyaiWs.onmessage = async (event) => {
       try {
         const data = JSON.parse(event.data);
@@ -233,7 +272,11 @@ async function initializeAssemblyAI(callSid: string, twilioSocket: WebSocket): P
       console.log('[AssemblyAI] Connection closed');
     };
 
-    return await connectionPromise;
+    const connected = await connection.opened;
+    if (connected) {
+      session.assemblyaiConnection = assemblyaiWs;
+    }
+    return connected;
   } catch (error) {
     console.error('[AssemblyAI] Connection error:', error);
     return false;
@@ -253,13 +296,13 @@ async function handleTwilioMessage(callSid: string, message: any, socket: WebSoc
     case 'start':
       console.log(`[Twilio] ========================================`);
       console.log('[Twilio] START EVENT RECEIVED');
-      console.log(`[Twilio] Full message:`, JSON.stringify(message, null, 2));
+      console.log(`[Twilio] Full message:`, JSON.stringify(message));
 
       const streamSid = message.start?.streamSid || null;
       const customParams = message.start?.customParameters || {};
 
       console.log(`[Twilio] Stream SID: ${streamSid}`);
-      console.log('[Twilio] Custom parameters:', JSON.stringify(customParams, null, 2));
+      console.log('[Twilio] Custom parameters:', JSON.stringify(customParams));
 
       // Extract parameters from TwiML
       const clientId = customParams.client_id;
@@ -279,6 +322,9 @@ async function handleTwilioMessage(callSid: string, message: any, socket: WebSoc
         return;
       }
 
+      // Start the AssemblyAI handshake now so it overlaps the client lookup
+      const assemblyaiConnection = connectAssemblyAI();
+
       // Look up client
       const { data: client, error: clientError } = await supabaseClient
         .from('voice_ai_clients')
@@ -289,6 +335,7 @@ async function handleTwilioMessage(callSid: string, message: any, socket: WebSoc
 
       if (clientError || !client) {
         console.error('[Twilio] Client not found:', clientId, clientError);
+        assemblyaiConnection?.ws.close();
         socket.close();
         return;
       }
@@ -306,19 +353,22 @@ async function handleTwilioMessage(callSid: string, message: any, socket: WebSoc
         conversationHistory: [],
         conversationLog: [],
         assemblyaiConnection: null,
-        sessionStartTime: Date.now(),
+        sessionStartTime: performance.now(),
         isProcessing: false,
         isSpeaking: false,
         currentAudioMark: null,
         currentSocket: socket,
         supabaseKeepaliveTimer: null,
         assemblyaiBuffer: [], // REQUIRED: AssemblyAI needs 50ms minimum, Twilio sends 20ms
+        systemPrompt: null,
+        systemPromptMinute: -1,
+        systemPromptProfile: null,
       };
 
       sessions.set(callSid, newSession);
 
       // Initialize AssemblyAI connection FIRST (critical path) - MATCH chat-websocket
-      const assemblyaiReady = await initializeAssemblyAI(callSid, socket);
+      const assemblyaiReady = await initializeAssemblyAI(callSid, socket, assemblyaiConnection);
       if (!assemblyaiReady) {
         console.error('[Twilio] Failed to initialize AssemblyAI');
         socket.close();
@@ -446,23 +496,20 @@ async function handleTwilioAudio(callSid: string, audioPayloadBase64: string) {
 
   try {
     // Decode μ-law audio from Twilio (20ms chunks = ~160 bytes at 8kHz)
-    const audioData = Uint8Array.from(atob(audioPayloadBase64), c => c.charCodeAt(0));
+    // Kept as a binary string; bytes are materialized once per combined send
+    const audioBinary = atob(audioPayloadBase64);
 
     // REQUIRED: AssemblyAI needs 50-1000ms chunks, Twilio sends 20ms
     // Buffer to 60ms (3 chunks × 20ms) - faster than old 100ms
-    session.assemblyaiBuffer.push(audioData);
+    session.assemblyaiBuffer.push(audioBinary);
 
     // Send when we have ≥50ms of audio (3 chunks × 20ms = 60ms)
     if (session.assemblyaiBuffer.length >= 3) {
-      // Calculate total size
-      const totalSize = session.assemblyaiBuffer.reduce((sum, chunk) => sum + chunk.length, 0);
-
-      // Combine all buffered chunks
-      const combinedAudio = new Uint8Array(totalSize);
-      let offset = 0;
-      for (const chunk of session.assemblyaiBuffer) {
-        combinedAudio.set(chunk, offset);
-        offset += chunk.length;
+      // Combine buffered chunks and convert to bytes in a single pass
+      const combinedBinary = session.assemblyaiBuffer.join('');
+      const combinedAudio = new Uint8Array(combinedBinary.length);
+      for (let i = 0; i < combinedBinary.length; i++) {
+        combinedAudio[i] = combinedBinary.charCodeAt(i);
       }
 
       // Send to AssemblyAI
@@ -478,118 +525,129 @@ async function handleTwilioAudio(callSid: string, audioPayloadBase64: string) {
   }
 }
 
-async function playPreRecordedAudio(callSid: string, socket: WebSocket, audioFileName: string) {
-  const session = sessions.get(callSid);
-  if (!session) return;
+// Pre-recorded μ-law audio, loaded lazily on first play and kept for the life
+// of the isolate so repeat callers skip the storage round trip. Entries expire
+// so a regenerated greeting (same file name, upserted) is picked up.
+// The audio is cached already split into Twilio-sized chunks and base64
+// encoded, so replaying a greeting doesn't re-encode the same bytes per call.
+const PRE_RECORDED_CACHE_TTL_MS = 10 * 60 * 1000;
+const PRE_RECORDED_CACHE_MAX_ENTRIES = 100;
+// EXACT MATCH TO FASTAPI: 8000-byte chunks (1 second of 8kHz μ-law)
+const PRE_RECORDED_CHUNK_SIZE = 8000;
+
+interface PreRecordedAudio {
+  payloads: string[]; // base64 μ-law, one per media message
+  byteLength: number;
+  loadedAt: number;
+}
 
-  try {
-    const startTime = Date.now();
-    console.log(`[PreRecorded] Fetching ${audioFileName} from Supabase Storage`);
+const preRecordedAudioCache = new Map<string, PreRecordedAudio>();
 
-    // Fetch pre-recorded μ-law audio from Supabase Storage
-    const storageUrl = `${Deno.env.get('SUPABASE_URL')}/storage/v1/object/public/audio-snippets/${audioFileName}`;
+async function loadPreRecordedAudio(audioFileName: string): Promise<PreRecordedAudio | null> {
+  const cached = preRecordedAudioCache.get(audioFileName);
+  if (cached && Date.now() - cached.loadedAt < PRE_RECORDED_CACHE_TTL_MS) {
+    console.log(`[PreRecorded] Cache hit for ${audioFileName} (${cached.byteLength} bytes)`);
+    return cached;
+  }
 
-    const response = await fetch(storageUrl);
-    if (!response.ok) {
-      console.error('[PreRecorded] Failed to fetch audio:', response.status);
-      return;
-    }
+  const startTime = Date.now();
+  console.log(`[PreRecorded] Fetching ${audioFileName} from Supabase Storage`);
 
-    const audioArrayBuffer = await response.arrayBuffer();
-    let ulawData = new Uint8Array(audioArrayBuffer);
-    console.log(`[PreRecorded] Fetched ${ulawData.length} bytes in ${Date.now() - startTime}ms`);
+  // Fetch pre-recorded μ-law audio from Supabase Storage
+  const storageUrl = `${AUDIO_SNIPPETS_BASE_URL}/${audioFileName}`;
 
-    // Log first 20 bytes to diagnose headers
-    const first20 = Array.from(ulawData.slice(0, 20)).map(b => b.toString(16).padStart(2, '0')).join(' ');
-    console.log(`[PreRecorded] First 20 bytes: ${first20}`);
+  const response = await fetch(storageUrl);
+  if (!response.ok) {
+    console.error('[PreRecorded] Failed to fetch audio:', response.status);
+    return null;
+  }
 
-    // Twilio says: "Should NOT include audio file type header bytes"
-    // Check for common audio file headers and strip them
+  const audioArrayBuffer = await response.arrayBuffer();
+  let ulawData = new Uint8Array(audioArrayBuffer);
+  console.log(`[PreRecorded] Fetched ${ulawData.length} bytes in ${Date.now() - startTime}ms`);
 
-    // WAV/RIFF header (starts with "RIFF")
-    if (ulawData.length > 44 &&
-        ulawData[0] === 0x52 && ulawData[1] === 0x49 &&
-        ulawData[2] === 0x46 && ulawData[3] === 0x46) {
-      console.log('[PreRecorded] ⚠️ Detected RIFF/WAV header, stripping 44 bytes');
-      ulawData = ulawData.slice(44);
-    }
+  // Log first 20 bytes to diagnose headers
+  if (DEBUG_LOGS) {
+    const first20 = Array.from(ulawData.subarray(0, 20)).map(b => b.toString(16).padStart(2, '0')).join(' ');
+    console.log(`[PreRecorded] First 20 bytes: ${first20}`);
+  }
 
-    // Check for .AU file header (starts with .snd)
-    else if (ulawData.length > 24 &&
-        ulawData[0] === 0x2e && ulawData[1] === 0x73 &&
-        ulawData[2] === 0x6e && ulawData[3] === 0x64) {
-      console.log('[PreRecorded] ⚠️ Detected .AU header, stripping 24 bytes');
-      ulawData = ulawData.slice(24);
-    }
+  // Twilio says: "Should NOT include audio file type header bytes"
+  // Check for common audio file headers and strip them
 
-    console.log(`[PreRecorded] Final audio size: ${ulawData.length} bytes (after header check)`);
+  // WAV/RIFF header (starts with "RIFF")
+  if (ulawData.length > 44 &&
+      ulawData[0] === 0x52 && ulawData[1] === 0x49 &&
+      ulawData[2] === 0x46 && ulawData[3] === 0x46) {
+    console.log('[PreRecorded] ⚠️ Detected RIFF/WAV header, stripping 44 bytes');
+    ulawData = ulawData.subarray(44);
+  }
 
-    // EXACT MATCH TO FASTAPI: Send in 8000-byte chunks (1 second of 8kHz μ-law)
-    const CHUNK_SIZE = 8000;
-    const totalChunks = Math.floor(ulawData.length / CHUNK_SIZE);
+  // Check for .AU file header (starts with .snd)
+  else if (ulawData.length > 24 &&
+      ulawData[0] === 0x2e && ulawData[1] === 0x73 &&
+      ulawData[2] === 0x6e && ulawData[3] === 0x64) {
+    console.log('[PreRecorded] ⚠️ Detected .AU header, stripping 24 bytes');
+    ulawData = ulawData.subarray(24);
+  }
 
-    console.log(`[PreRecorded] Sending ${totalChunks} chunks of ${CHUNK_SIZE} bytes each`);
+  // Split into chunks and base64 encode once (the last chunk may be short -
+  // no padding needed for μ-law)
+  const payloads: string[] = [];
+  for (let start = 0; start < ulawData.length; start += PRE_RECORDED_CHUNK_SIZE) {
+    const chunk = ulawData.subarray(start, start + PRE_RECORDED_CHUNK_SIZE);
 
-    // Send chunks with minimal delay (FastAPI pattern)
-    for (let i = 0; i < totalChunks; i++) {
-      const startPos = i * CHUNK_SIZE;
-      const endPos = startPos + CHUNK_SIZE;
-      const chunk = ulawData.slice(startPos, endPos);
+    // Convert to base64 (JavaScript equivalent of Python's base64.b64encode().decode("ascii"))
+    let binary = '';
+    for (let j = 0; j < chunk.length; j++) {
+      binary += String.fromCharCode(chunk[j]);
+    }
+    payloads.push(btoa(binary));
+  }
 
-      // Convert to base64 (JavaScript equivalent of Python's base64.b64encode().decode("ascii"))
-      let binary = '';
-      for (let j = 0; j < chunk.length; j++) {
-        binary += String.fromCharCode(chunk[j]);
-      }
-      const payload = btoa(binary);
+  const audio: PreRecordedAudio = { payloads, byteLength: ulawData.length, loadedAt: Date.now() };
 
-      // Send chunk to Twilio
-      const message = {
-        event: 'media',
-        streamSid: session.streamSid,
-        media: {
-          payload: payload
-        }
-      };
+  preRecordedAudioCache.delete(audioFileName);
+  if (preRecordedAudioCache.size >= PRE_RECORDED_CACHE_MAX_ENTRIES) {
+    preRecordedAudioCache.delete(preRecordedAudioCache.keys().next().value!);
+  }
+  preRecordedAudioCache.set(audioFileName, audio);
 
-      if (socket.readyState === WebSocket.OPEN) {
-        socket.send(JSON.stringify(message));
-      }
+  return audio;
+}
 
-      // 10ms delay between chunks (FastAPI pattern)
-      await new Promise(resolve => setTimeout(resolve, 10));
+async function playPreRecordedAudio(callSid: string, socket: WebSocket, audioFileName: string) {
+  const session = sessions.get(callSid);
+  if (!session) return;
 
-      if ((i + 1) % 100 === 0) {
-        console.log(`[PreRecorded] Sent ${i + 1}/${totalChunks} chunks...`);
-      }
-    }
+  try {
+    const startTime = Date.now();
 
-    // Send remaining bytes (no padding needed for μ-law)
-    const remainingBytes = ulawData.length % CHUNK_SIZE;
-    if (remainingBytes > 0) {
-      const lastChunkStart = totalChunks * CHUNK_SIZE;
-      const lastChunk = ulawData.slice(lastChunkStart);
+    const audio = await loadPreRecordedAudio(audioFileName);
+    if (!audio) return;
 
-      let binary = '';
-      for (let j = 0; j < lastChunk.length; j++) {
-        binary += String.fromCharCode(lastChunk[j]);
-      }
-      const payload = btoa(binary);
+    const { payloads } = audio;
+    console.log(`[PreRecorded] Final audio size: ${audio.byteLength} bytes (after header check)`);
+    console.log(`[PreRecorded] Sending ${payloads.length} chunks of up to ${PRE_RECORDED_CHUNK_SIZE} bytes each`);
 
-      const message = {
-        event: 'media',
-        streamSid: session.streamSid,
-        media: {
-          payload: payload
-        }
-      };
+    // Send chunks back-to-back - Twilio buffers media frames and paces playback
+    // itself, so sleeping between sends only delays the tail of the audio
+    // Only the payload changes between frames, so serialize the envelope once
+    // (base64 never needs JSON escaping) instead of JSON.stringify per chunk
+    const framePrefix = `{"event":"media","streamSid":${JSON.stringify(session.streamSid)},"media":{"payload":"`;
 
+    for (let i = 0; i < payloads.length; i++) {
+      // Send chunk to Twilio
       if (socket.readyState === WebSocket.OPEN) {
-        socket.send(JSON.stringify(message));
+        socket.send(framePrefix + payloads[i] + '"}}');
+      }
+
+      if (DEBUG_LOGS && (i + 1) % 100 === 0) {
+        console.log(`[PreRecorded] Sent ${i + 1}/${payloads.length} chunks...`);
       }
     }
 
-    console.log(`[PreRecorded] ✅ Sent intro audio in ${totalChunks} chunks (${ulawData.length} bytes) in ${Date.now() - startTime}ms`);
+    console.log(`[PreRecorded] ✅ Sent intro audio in ${payloads.length} chunks (${audio.byteLength} bytes) in ${Date.now() - startTime}ms`);
   } catch (error) {
     console.error('[PreRecorded] Error playing audio:', error);
   }
@@ -616,38 +674,12 @@ async function processWithGPTStreaming(callSid: string, userInput: string, socke
   const session = sessions.get(callSid);
   if (!session) return;
 
-  const GROQ_API_KEY = Deno.env.get('GROQ_API_KEY');
   if (!GROQ_API_KEY) {
     console.error('[GPT-OSS] Groq API key not configured');
     return;
   }
 
-  // Build voice-optimized system prompt using voice profile
-  const systemPrompt = session.voiceProfile
-    ? buildVoiceOptimizedPrompt(
-        {
-          business_name: session.client.business_name,
-          region: session.client.region,
-          industry: session.client.industry,
-          system_prompt: session.client.system_prompt,
-          channel_type: 'phone',
-          business_hours: session.client.business_hours,
-          timezone: session.client.timezone,
-          // Business context fields (added November 2025)
-          website_url: session.client.website_url,
-          business_address: session.client.business_address,
-          services_offered: session.client.services_offered,
-          pricing_info: session.client.pricing_info,
-          target_audience: session.client.target_audience,
-          tone: session.client.tone,
-          // Call transfer fields
-          call_transfer_enabled: session.client.call_transfer_enabled,
-          call_transfer_number: session.client.call_transfer_number, // Defaults to phone_number during onboarding
-          email: session.client.email
-        },
-        session.voiceProfile
-      )
-    : buildSystemPromptFallback(session); // Fallback if no voice profile
+  const systemPrompt = getSystemPrompt(session);
 
   try {
     const messages = [
@@ -793,12 +825,7 @@ async function processWithGPTStreaming(callSid: string, userInput: string, socke
 
         // Log failed transfer attempt in database
         try {
-          const supabaseClient = createClient(
-            Deno.env.get('SUPABASE_URL') ?? '',
-            Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
-          );
-
-          await supabaseClient.from('agent_transfers').insert({
+          await session.supabase.from('agent_transfers').insert({
             call_sid: session.callSid,
             client_id: session.client.client_id,
             transcript: session.conversationHistory.map(m => `${m.role}: ${m.content}`).join('\n'),
@@ -823,14 +850,8 @@ async function processWithGPTStreaming(callSid: string, userInput: string, socke
         console.log('[Transfer] ✅ Calling agent-transfer function...');
 
         try {
-          // Get Supabase client
-          const supabaseClient = createClient(
-            Deno.env.get('SUPABASE_URL') ?? '',
-            Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
-          );
-
           // Call agent-transfer edge function
-          const { data, error } = await supabaseClient.functions.invoke('agent-transfer', {
+          const { data, error } = await session.supabase.functions.invoke('agent-transfer', {
             body: {
               call_sid: session.callSid,
               client_id: session.client.client_id,
@@ -847,7 +868,8 @@ async function processWithGPTStreaming(callSid: string, userInput: string, socke
               callSid,
               "I apologize, but I'm having trouble transferring you right now. Let me continue helping you directly.",
               socket,
-              audioChunkIndex++
+              audioChunkIndex++,
+              true
             );
           } else {
             console.log('[Transfer] ✅ Transfer initiated successfully:', data);
@@ -912,14 +934,8 @@ async function processWithGPTStreaming(callSid: string, userInput: string, socke
             service
           });
 
-          // Get Supabase client
-          const supabaseClient = createClient(
-            Deno.env.get('SUPABASE_URL') ?? '',
-            Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
-          );
-
           // Call calendar-integration function to create booking
-          const { data: bookingData, error: bookingError } = await supabaseClient.functions.invoke('calendar-integration', {
+          const { data: bookingData, error: bookingError } = await session.supabase.functions.invoke('calendar-integration', {
             body: {
               action: 'create_booking',
               client_id: session.client.client_id,
@@ -945,7 +961,8 @@ async function processWithGPTStreaming(callSid: string, userInput: string, socke
               callSid,
               errorMessage,
               socket,
-              audioChunkIndex++
+              audioChunkIndex++,
+              true
             );
 
             session.conversationLog.push({
@@ -1017,11 +1034,85 @@ async function processWithGPTStreaming(callSid: string, userInput: string, socke
   }
 }
 
-async function generateAndStreamTTS(callSid: string, text: string, socket: WebSocket, chunkIndex: number) {
+// Synthesized payloads for fixed fallback lines (transfer/booking failures),
+// keyed by voice + text - these play when something has already gone wrong,
+// so they shouldn't wait on (or fail with) another ElevenLabs round trip
+const staticTtsPayloadCache = new Map<string, string>();
+
+/**
+ * Fetch μ-law TTS audio from ElevenLabs and return it as a base64 media payload
+ * (file headers stripped), or null if the API call fails
+ */
+async function fetchElevenLabsPayload(voiceId: string, normalizedText: string, chunkIndex: number): Promise<string | null> {
+  // Use STREAMING endpoint like FastAPI does
+  const response = await fetch(
+    `https://api.elevenlabs.io/v1/text-to-speech/${voiceId}/stream?output_format=ulaw_8000`,
+    {
+      method: 'POST',
+      headers: {
+        'Accept': '*/*',
+        'Content-Type': 'application/json',
+        'xi-api-key': ELEVENLABS_API_KEY
+      },
+      body: JSON.stringify({
+        text: normalizedText,
+        model_id: 'eleven_flash_v2_5',
+        voice_settings: {
+          stability: 0.5,
+          similarity_boost: 0.8,
+          style: 0.0,
+          use_speaker_boost: false
+        }
+      })
+    }
+  );
+
+  if (!response.ok) {
+    console.error('[ElevenLabs] API error:', await response.text());
+    return null;
+  }
+
+  const audioArrayBuffer = await response.arrayBuffer();
+  let audioBytes = new Uint8Array(audioArrayBuffer);
+
+  // Log size and first 20 bytes to diagnose headers
+  if (DEBUG_LOGS) {
+    console.log(`[ElevenLabs #${chunkIndex}] Received ${audioBytes.length} bytes`);
+    const first20 = Array.from(audioBytes.subarray(0, 20)).map(b => b.toString(16).padStart(2, '0')).join(' ');
+    console.log(`[ElevenLabs] First 20 bytes: ${first20}`);
+  }
+
+  // Twilio says: "Should NOT include audio file type header bytes"
+  // Check for common audio file headers and strip them
+
+  // WAV/RIFF header (starts with "RIFF")
+  if (audioBytes.length > 44 &&
+      audioBytes[0] === 0x52 && audioBytes[1] === 0x49 &&
+      audioBytes[2] === 0x46 && audioBytes[3] === 0x46) {
+    console.log('[ElevenLabs] ⚠️ Detected RIFF/WAV header, stripping 44 bytes');
+    audioBytes = audioBytes.subarray(44);
+  }
+
+  // Check for .AU file header (starts with .snd)
+  else if (audioBytes.length > 24 &&
+      audioBytes[0] === 0x2e && audioBytes[1] === 0x73 &&
+      audioBytes[2] === 0x6e && audioBytes[3] === 0x64) {
+    console.log('[ElevenLabs] ⚠️ Detected .AU header, stripping 24 bytes');
+    audioBytes = audioBytes.subarray(24);
+  }
+
+  // Send audio immediately to Twilio (no buffering like chat-websocket)
+  if (DEBUG_LOGS) {
+    console.log(`[ElevenLabs #${chunkIndex}] Sending ${audioBytes.length} bytes to Twilio`);
+  }
+
+  return btoa(String.fromCharCode.apply(null, Array.from(audioBytes)));
+}
+
+async function generateAndStreamTTS(callSid: string, text: string, socket: WebSocket, chunkIndex: number, cacheable = false) {
   const session = sessions.get(callSid);
   if (!session) return;
 
-  const ELEVENLABS_API_KEY = Deno.env.get('ELEVENLABS_API_KEY');
   if (!ELEVENLABS_API_KEY) {
     console.error('[ElevenLabs] API key not configured');
     return;
@@ -1036,69 +1127,25 @@ async function generateAndStreamTTS(callSid: string, text: string, socket: WebSo
     const startTime = Date.now();
     console.log(`[ElevenLabs #${chunkIndex}] Generating TTS for: "${normalizedText.substring(0, 50)}..."`);
 
-    // Use STREAMING endpoint like FastAPI does
-    const response = await fetch(
-      `https://api.elevenlabs.io/v1/text-to-speech/${voiceId}/stream?output_format=ulaw_8000`,
-      {
-        method: 'POST',
-        headers: {
-          'Accept': '*/*',
-          'Content-Type': 'application/json',
-          'xi-api-key': ELEVENLABS_API_KEY
-        },
-        body: JSON.stringify({
-          text: normalizedText,
-          model_id: 'eleven_flash_v2_5',
-          voice_settings: {
-            stability: 0.5,
-            similarity_boost: 0.8,
-            style: 0.0,
-            use_speaker_boost: false
-          }
-        })
-      }
-    );
-
-    if (!response.ok) {
-      console.error('[ElevenLabs] API error:', await response.text());
-      return;
-    }
-
-    const audioArrayBuffer = await response.arrayBuffer();
-    let audioBytes = new Uint8Array(audioArrayBuffer);
-    console.log(`[ElevenLabs #${chunkIndex}] Received ${audioBytes.length} bytes`);
-
-    // Log first 20 bytes to diagnose headers
-    const first20 = Array.from(audioBytes.slice(0, 20)).map(b => b.toString(16).padStart(2, '0')).join(' ');
-    console.log(`[ElevenLabs] First 20 bytes: ${first20}`);
-
-    // Twilio says: "Should NOT include audio file type header bytes"
-    // Check for common audio file headers and strip them
-
-    // WAV/RIFF header (starts with "RIFF")
-    if (audioBytes.length > 44 &&
-        audioBytes[0] === 0x52 && audioBytes[1] === 0x49 &&
-        audioBytes[2] === 0x46 && audioBytes[3] === 0x46) {
-      console.log('[ElevenLabs] ⚠️ Detected RIFF/WAV header, stripping 44 bytes');
-      audioBytes = audioBytes.slice(44);
-    }
+    const cacheKey = cacheable ? `${voiceId}:${normalizedText}` : null;
+    let payload = cacheKey ? staticTtsPayloadCache.get(cacheKey) : undefined;
 
-    // Check for .AU file header (starts with .snd)
-    else if (audioBytes.length > 24 &&
-        audioBytes[0] === 0x2e && audioBytes[1] === 0x73 &&
-        audioBytes[2] === 0x6e && audioBytes[3] === 0x64) {
-      console.log('[ElevenLabs] ⚠️ Detected .AU header, stripping 24 bytes');
-      audioBytes = audioBytes.slice(24);
+    if (payload) {
+      console.log(`[ElevenLabs #${chunkIndex}] Using cached audio for static line`);
+    } else {
+      const fetched = await fetchElevenLabsPayload(voiceId, normalizedText, chunkIndex);
+      if (!fetched) return;
+      payload = fetched;
+      if (cacheKey) {
+        staticTtsPayloadCache.set(cacheKey, fetched);
+      }
     }
 
-    // Send audio immediately to Twilio (no buffering like chat-websocket)
-    console.log(`[ElevenLabs #${chunkIndex}] Sending ${audioBytes.length} bytes to Twilio`);
-
     const mediaMessage = {
       event: 'media',
       streamSid: session.streamSid,
       media: {
-        payload: btoa(String.fromCharCode.apply(null, Array.from(audioBytes)))
+        payload
       }
     };
 
@@ -1126,6 +1173,54 @@ async function generateAndStreamTTS(callSid: string, text: string, socket: WebSo
   }
 }
 
+/**
+ * Return the system prompt for this session, rebuilding it at most once per
+ * clock minute (the date/time context is minute-granular) or when the voice
+ * profile finishes loading. Every other turn reuses the cached string.
+ */
+function getSystemPrompt(session: TwilioVoiceSession): string {
+  const minute = Math.floor(Date.now() / 60000);
+  if (
+    session.systemPrompt !== null &&
+    session.systemPromptMinute === minute &&
+    session.systemPromptProfile === session.voiceProfile
+  ) {
+    return session.systemPrompt;
+  }
+
+  // Build voice-optimized system prompt using voice profile
+  const systemPrompt = session.voiceProfile
+    ? buildVoiceOptimizedPrompt(
+        {
+          business_name: session.client.business_name,
+          region: session.client.region,
+          industry: session.client.industry,
+          system_prompt: session.client.system_prompt,
+          channel_type: 'phone',
+          business_hours: session.client.business_hours,
+          timezone: session.client.timezone,
+          // Business context fields (added November 2025)
+          website_url: session.client.website_url,
+          business_address: session.client.business_address,
+          services_offered: session.client.services_offered,
+          pricing_info: session.client.pricing_info,
+          target_audience: session.client.target_audience,
+          tone: session.client.tone,
+          // Call transfer fields
+          call_transfer_enabled: session.client.call_transfer_enabled,
+          call_transfer_number: session.client.call_transfer_number, // Defaults to phone_number during onboarding
+          email: session.client.email
+        },
+        session.voiceProfile
+      )
+    : buildSystemPromptFallback(session); // Fallback if no voice profile
+
+  session.systemPrompt = systemPrompt;
+  session.systemPromptMinute = minute;
+  session.systemPromptProfile = session.voiceProfile;
+  return systemPrompt;
+}
+
 function buildSystemPromptFallback(session: TwilioVoiceSession): string {
   const client = session.client;
   const businessName = client.business_name || 'the business';
@@ -1167,18 +1262,24 @@ async function finalizeCallSession(callSid: string) {
     console.log('[Supabase] Keepalive timer cleared');
   }
 
-  const duration = Math.floor((Date.now() - session.sessionStartTime) / 1000);
+  const duration = Math.floor((performance.now() - session.sessionStartTime) / 1000);
 
-  // Save conversation logs
-  for (const log of session.conversationLog) {
-    await session.supabase.from('conversation_logs').insert({
-      call_sid: callSid,
-      client_id: session.client.client_id,
-      speaker: log.speaker,
-      content: log.content,
-      message_type: log.message_type,
-      created_at: log.timestamp
-    });
+  // Save conversation logs in one batched insert (one round trip for the whole call)
+  if (session.conversationLog.length > 0) {
+    const { error: logsError } = await session.supabase.from('conversation_logs').insert(
+      session.conversationLog.map(log => ({
+        call_sid: callSid,
+        client_id: session.client.client_id,
+        speaker: log.speaker,
+        content: log.content,
+        message_type: log.message_type,
+        created_at: log.timestamp
+      }))
+    );
+
+    if (logsError) {
+      console.error('[Database] Error saving conversation logs:', logsError);
+    }
   }
 
   // Update call session
@@ -1202,11 +1303,12 @@ async function finalizeCallSession(callSid: string) {
   console.log(`[Twilio] ✅ Call completed: ${duration}s`);
 
   // Extract and save lead information from conversation
-  if (session && session.conversationLog.length > 0) {
-    await extractAndSaveLead(session);
+  if (session.conversationLog.length > 0) {
+    const analysisTranscript = buildAnalysisTranscript(session.conversationLog);
+    await extractAndSaveLead(session, analysisTranscript);
 
     // Process calendar booking if conversation contains booking intent
-    await processCalendarBooking(session, callSid).catch(err =>
+    await processCalendarBooking(session, callSid, analysisTranscript).catch(err =>
       console.error('[Booking] Background booking error:', err)
     );
   }
@@ -1214,7 +1316,7 @@ async function finalizeCallSession(callSid: string) {
   // ========================================
   // MINUTE-BASED TRACKING (NEW - Nov 1, 2025)
   // ========================================
-  if (session && session.client) {
+  if (session.client) {
     await trackMinuteUsage(session, duration);
   }
 
@@ -1240,34 +1342,37 @@ async function cleanupSession(callSid: string) {
 // LEAD CAPTURE FUNCTIONS
 // ============================================================================
 
+/**
+ * Build the Customer/AI transcript shared by lead and booking extraction
+ * (built once per session end, truncated for Groq's token limits)
+ */
+function buildAnalysisTranscript(messages: any[]): string {
+  const transcript = messages
+    .map((msg: any) => `${msg.speaker === 'user' ? 'Customer' : 'AI'}: ${msg.content}`)
+    .join('\n');
+
+  const maxLength = 8000; // ~2000 tokens
+  return transcript.length > maxLength
+    ? transcript.substring(0, maxLength) + '...[truncated]'
+    : transcript;
+}
+
 /**
  * Extract lead information from conversation and save to database
  */
-async function extractAndSaveLead(session: any) {
-  const GROQ_API_KEY = Deno.env.get('GROQ_API_KEY');
+async function extractAndSaveLead(session: any, truncatedTranscript: string) {
   if (!GROQ_API_KEY) {
     console.log('[Lead Capture] Groq API key not found, skipping lead extraction');
     return;
   }
 
   try {
-    // Build conversation transcript for analysis
-    const transcript = session.conversationLog
-      .map((msg: any) => `${msg.speaker === 'user' ? 'Customer' : 'AI'}: ${msg.content}`)
-      .join('\n');
-
     // Validate transcript is not empty
-    if (!transcript || transcript.trim().length === 0) {
+    if (!truncatedTranscript || truncatedTranscript.trim().length === 0) {
       console.log('[Lead Capture] Empty transcript, skipping');
       return;
     }
 
-    // Truncate if too long (Groq has token limits)
-    const maxLength = 8000; // ~2000 tokens
-    const truncatedTranscript = transcript.length > maxLength
-      ? transcript.substring(0, maxLength) + '...[truncated]'
-      : transcript;
-
     console.log('[Lead Capture] Analyzing conversation for lead information...');
 
     // Use LLM to extract lead information
@@ -1376,31 +1481,19 @@ Examples:
  * Process calendar booking intent from conversation (runs in background at end of call)
  * Uses separate LLM call to extract booking details, then creates appointment
  */
-async function processCalendarBooking(session: any, callSid: string): Promise<void> {
-  const GROQ_API_KEY = Deno.env.get('GROQ_API_KEY');
+async function processCalendarBooking(session: any, callSid: string, truncatedTranscript: string): Promise<void> {
   if (!GROQ_API_KEY) {
     console.log('[Booking] Groq API key not found, skipping booking check');
     return;
   }
 
   try {
-    // Build conversation transcript for analysis
-    const transcript = session.conversationLog
-      .map((msg: any) => `${msg.speaker === 'user' ? 'Customer' : 'AI'}: ${msg.content}`)
-      .join('\n');
-
     // Validate transcript is not empty
-    if (!transcript || transcript.trim().length === 0) {
+    if (!truncatedTranscript || truncatedTranscript.trim().length === 0) {
       console.log('[Booking] Empty transcript, skipping');
       return;
     }
 
-    // Truncate if too long
-    const maxLength = 8000;
-    const truncatedTranscript = transcript.length > maxLength
-      ? transcript.substring(0, maxLength) + '...[truncated]'
-      : transcript;
-
     console.log('[Booking] Analyzing conversation for booking intent...');
 
     // Use LLM to check if conversation contains booking request
@@ -1674,95 +1767,71 @@ async function trackMinuteUsage(session: TwilioVoiceSession, durationSeconds: nu
     const minutes = Math.ceil(durationSeconds / 60);
     console.log(`[Minutes] Call duration: ${durationSeconds}s = ${minutes} minute(s)`);
 
-    // Fetch current client data to check plan status
-    const { data: clientData, error: fetchError } = await session.supabase
-      .from('voice_ai_clients')
-      .select('client_id, trial_minutes, trial_minutes_used, paid_plan, paid_minutes_used, paid_minutes_included, dodo_customer_id')
-      .eq('client_id', session.client.client_id)
-      .single();
+    // Atomically add the minutes to trial or paid usage (single UPDATE ... RETURNING)
+    const { data: clientRows, error: updateError } = await session.supabase
+      .rpc('increment_minutes_used', {
+        p_client_id: session.client.client_id,
+        p_minutes: minutes
+      });
+
+    const clientData = clientRows?.[0];
 
-    if (fetchError || !clientData) {
-      console.error('[Minutes] Failed to fetch client data:', fetchError);
+    if (updateError || !clientData) {
+      console.error('[Minutes] Failed to update minutes used:', updateError);
       return;
     }
 
     // Determine if user is on trial or paid plan
     const isOnTrial = !clientData.paid_plan; // FALSE = trial user
-    const currentMinutesUsed = isOnTrial ? (clientData.trial_minutes_used || 0) : (clientData.paid_minutes_used || 0);
-    const newMinutesUsed = currentMinutesUsed + minutes;
 
     if (isOnTrial) {
-      // Update trial minutes
-      const { error: updateError } = await session.supabase
-        .from('voice_ai_clients')
-        .update({
-          trial_minutes_used: newMinutesUsed,
-          updated_at: new Date().toISOString()
-        })
-        .eq('client_id', session.client.client_id);
-
-      if (updateError) {
-        console.error('[Minutes] Failed to update trial_minutes_used:', updateError);
-      } else {
-        const remaining = (clientData.trial_minutes || 30) - newMinutesUsed;
-        console.log(`[Minutes] ✅ Trial usage updated: ${newMinutesUsed}/${clientData.trial_minutes || 30} minutes (${remaining} remaining)`);
-
-        // Warn if trial is almost exhausted
-        if (remaining <= 5 && remaining > 0) {
-          console.warn(`[Minutes] ⚠️ Trial almost exhausted for ${session.client.client_id}: ${remaining} minutes left`);
-        } else if (remaining <= 0) {
-          console.warn(`[Minutes] ⚠️ Trial EXHAUSTED for ${session.client.client_id}`);
-        }
+      const newMinutesUsed = clientData.trial_minutes_used || 0;
+      const remaining = (clientData.trial_minutes || 30) - newMinutesUsed;
+      console.log(`[Minutes] ✅ Trial usage updated: ${newMinutesUsed}/${clientData.trial_minutes || 30} minutes (${remaining} remaining)`);
+
+      // Warn if trial is almost exhausted
+      if (remaining <= 5 && remaining > 0) {
+        console.warn(`[Minutes] ⚠️ Trial almost exhausted for ${session.client.client_id}: ${remaining} minutes left`);
+      } else if (remaining <= 0) {
+        console.warn(`[Minutes] ⚠️ Trial EXHAUSTED for ${session.client.client_id}`);
       }
     } else {
-      // Update paid plan minutes
-      const { error: updateError } = await session.supabase
-        .from('voice_ai_clients')
-        .update({
-          paid_minutes_used: newMinutesUsed,
-          updated_at: new Date().toISOString()
-        })
-        .eq('client_id', session.client.client_id);
+      const newMinutesUsed = clientData.paid_minutes_used || 0;
+      const included = clientData.paid_minutes_included || 0;
+      const remaining = included - newMinutesUsed;
+      const overage = remaining < 0 ? Math.abs(remaining) : 0;
 
-      if (updateError) {
-        console.error('[Minutes] Failed to update paid_minutes_used:', updateError);
-      } else {
-        const included = clientData.paid_minutes_included || 0;
-        const remaining = included - newMinutesUsed;
-        const overage = remaining < 0 ? Math.abs(remaining) : 0;
-
-        console.log(`[Minutes] ✅ Paid usage updated: ${newMinutesUsed}/${included} minutes (Paid plan active)`);
+      console.log(`[Minutes] ✅ Paid usage updated: ${newMinutesUsed}/${included} minutes (Paid plan active)`);
 
-        if (overage > 0) {
-          console.warn(`[Minutes] ⚠️ OVERAGE for ${session.client.client_id}: ${overage} minutes over plan limit`);
-        } else if (remaining <= 50) {
-          console.warn(`[Minutes] ⚠️ Plan almost exhausted for ${session.client.client_id}: ${remaining} minutes left`);
-        }
-
-        // CRITICAL: Send usage to DodoPayments for overage billing
-        // Only for paid customers with dodo_customer_id
-        if (clientData.paid_plan && clientData.dodo_customer_id) {
-          try {
-            console.log(`[DodoUsage] Sending ${minutes} minutes to DodoPayments for ${session.client.client_id}`);
+      if (overage > 0) {
+        console.warn(`[Minutes] ⚠️ OVERAGE for ${session.client.client_id}: ${overage} minutes over plan limit`);
+      } else if (remaining <= 50) {
+        console.warn(`[Minutes] ⚠️ Plan almost exhausted for ${session.client.client_id}: ${remaining} minutes left`);
+      }
 
-            const { error: ingestError } = await session.supabase.functions.invoke('ingest-call-usage', {
-              body: {
-                client_id: session.client.client_id,
-                minutes_used: minutes
-              }
-            });
+      // CRITICAL: Send usage to DodoPayments for overage billing
+      // Only for paid customers with dodo_customer_id
+      if (clientData.paid_plan && clientData.dodo_customer_id) {
+        try {
+          console.log(`[DodoUsage] Sending ${minutes} minutes to DodoPayments for ${session.client.client_id}`);
 
-            if (ingestError) {
-              console.error('[DodoUsage] Failed to send usage to DodoPayments:', ingestError);
-            } else {
-              console.log('[DodoUsage] ✅ Usage sent to DodoPayments successfully');
+          const { error: ingestError } = await session.supabase.functions.invoke('ingest-call-usage', {
+            body: {
+              client_id: session.client.client_id,
+              minutes_used: minutes
             }
-          } catch (error) {
-            console.error('[DodoUsage] Error calling ingest-call-usage:', error);
+          });
+
+          if (ingestError) {
+            console.error('[DodoUsage] Failed to send usage to DodoPayments:', ingestError);
+          } else {
+            console.log('[DodoUsage] ✅ Usage sent to DodoPayments successfully');
           }
-        } else {
-          console.log('[DodoUsage] Skipping - Trial user or no dodo_customer_id');
+        } catch (error) {
+          console.error('[DodoUsage] Error calling ingest-call-usage:', error);
         }
+      } else {
+        console.log('[DodoUsage] Skipping - Trial user or no dodo_customer_id');
       }
     }
 
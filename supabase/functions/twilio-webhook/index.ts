@@ -5,6 +5,11 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+const supabaseClient = createClient(
+  Deno.env.get('SUPABASE_URL') ?? '',
+  Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
+);
+
 Deno.serve(async (req) => {
   // Handle CORS preflight requests
   if (req.method === 'OPTIONS') {
@@ -12,14 +17,9 @@ Deno.serve(async (req) => {
   }
 
   try {
-    const supabaseClient = createClient(
-      Deno.env.get('SUPABASE_URL') ?? '',
-      Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
-    );
-
     const url = new URL(req.url);
-    const pathSegments = url.pathname.split('/');
-    const eventType = pathSegments[pathSegments.length - 1]; // 'voice', 'status', 'sms', etc.
+    // Last path segment, sliced directly instead of splitting the whole path
+    const eventType = url.pathname.slice(url.pathname.lastIndexOf('/') + 1); // 'voice', 'status', 'sms', etc.
 
     switch (eventType) {
       case 'voice':
@@ -66,9 +66,11 @@ async function handleVoiceWebhook(req: Request, supabase: any) {
   const lookupNumber = direction === 'outbound-api' ? from : to;
   console.log(`Looking up client by Twilio number: ${lookupNumber}`);
 
+  // Only the columns routing + trial enforcement read - skips prompts, business
+  // context, widget settings etc. on every incoming call
   const { data: client } = await supabase
     .from('voice_ai_clients')
-    .select('*')
+    .select('client_id, business_name, trial_minutes, trial_minutes_used, paid_plan, paid_minutes_used, paid_minutes_included')
     .eq('twilio_number', lookupNumber)
     .single();
 
@@ -157,35 +159,18 @@ async function handleStatusWebhook(req: Request, supabase: any) {
     return new Response('Missing CallSid', { status: 400 });
   }
 
-  // Check if call session exists
-  const { data: existingSession, error: lookupError } = await supabase
-    .from('call_sessions')
-    .select('id, status')
-    .eq('call_sid', callSid)
-    .maybeSingle();
-
-  if (lookupError) {
-    console.error('[Status] Database lookup error:', lookupError);
-  }
-
-  if (!existingSession) {
-    console.warn(`[Status] ⚠️ No call session found for SID: ${callSid} - call may have been created outside our system`);
-    // Don't fail - Twilio will retry if we return error
-    return new Response('OK - Session not found', { status: 200 });
-  }
-
-  console.log(`[Status] Found session ${existingSession.id} with current status: ${existingSession.status}`);
-
-  // Update call session
+  // Update call session directly - the returned rows tell us whether it existed,
+  // so there's no separate lookup round trip before the write
+  const now = new Date().toISOString();
   const updateData: any = {
     status: mapTwilioStatus(callStatus),
-    updated_at: new Date().toISOString()
+    updated_at: now
   };
 
   if (callStatus === 'completed' && callDuration) {
     const durationSeconds = parseInt(callDuration);
     updateData.duration_seconds = durationSeconds;
-    updateData.end_time = new Date().toISOString();
+    updateData.end_time = now;
 
     // Calculate cost: $2.00 flat per completed call (regardless of duration)
     // This matches our marketing and business model
@@ -194,16 +179,23 @@ async function handleStatusWebhook(req: Request, supabase: any) {
     console.log(`[Status] Call completed - Duration: ${durationSeconds}s, Cost: $${updateData.cost_amount}`);
   }
 
-  const { error: updateError } = await supabase
+  const { data: updatedSessions, error: updateError } = await supabase
     .from('call_sessions')
     .update(updateData)
-    .eq('call_sid', callSid);
+    .eq('call_sid', callSid)
+    .select('id');
 
   if (updateError) {
     console.error('[Status] ❌ Error updating call session:', updateError);
     return new Response('Database update failed', { status: 500 });
   }
 
+  if (!updatedSessions || updatedSessions.length === 0) {
+    console.warn(`[Status] ⚠️ No call session found for SID: ${callSid} - call may have been created outside our system`);
+    // Don't fail - Twilio will retry if we return error
+    return new Response('OK - Session not found', { status: 200 });
+  }
+
   console.log(`[Status] ✅ Successfully updated call ${callSid} to status: ${updateData.status}`);
   console.log('[Status] ========================================');
 
@@ -148,11 +148,12 @@ class VoiceAISession {
 
   private async handleAudioData(message: any, socket: WebSocket) {
     // Accumulate audio data
-    const audioData = new Uint8Array(
-      atob(message.media.payload)
-        .split('')
-        .map(c => c.charCodeAt(0))
-    );
+    // Decode straight into the byte array (no intermediate char array)
+    const audioBinary = atob(message.media.payload);
+    const audioData = new Uint8Array(audioBinary.length);
+    for (let i = 0; i < audioBinary.length; i++) {
+      audioData[i] = audioBinary.charCodeAt(i);
+    }
     
     this.audioBuffer.push(audioData);
 
@@ -1,4 +1,3 @@
-import "https://deno.land/x/xhr@0.1.0/mod.ts";
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts";
 import { createClient } from "https://esm.sh/@supabase/supabase-js@2";
 
@@ -7,6 +6,15 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+const jsonHeaders = { ...corsHeaders, 'Content-Type': 'application/json' };
+
+const OPENAI_API_KEY = Deno.env.get('OPENAI_API_KEY');
+
+const supabaseClient = createClient(
+  Deno.env.get('SUPABASE_URL') ?? '',
+  Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
+);
+
 serve(async (req) => {
   if (req.method === 'OPTIONS') {
     return new Response(null, { headers: corsHeaders });
@@ -19,7 +27,6 @@ serve(async (req) => {
       throw new Error('Missing required parameters');
     }
 
-    const OPENAI_API_KEY = Deno.env.get('OPENAI_API_KEY');
     if (!OPENAI_API_KEY) {
       throw new Error('OPENAI_API_KEY not configured');
     }
@@ -27,11 +34,6 @@ serve(async (req) => {
     console.log(`🧠 Router request for client: ${client_id}`);
 
     // Get client configuration from database
-    const supabaseClient = createClient(
-      Deno.env.get('SUPABASE_URL') ?? '',
-      Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
-    );
-
     const { data: client, error: clientError } = await supabaseClient
       .from('voice_ai_clients')
       .select('*')
@@ -43,7 +45,7 @@ serve(async (req) => {
     }
 
     // Check for audio snippet match first (replaces smart_router.py logic)
-    const audioSnippet = await checkAudioSnippets(user_input, client.audio_snippets);
+    const audioSnippet = await checkAudioSnippets(user_input, client);
     
     if (audioSnippet) {
       console.log(`🎵 Using audio snippet: ${audioSnippet}`);
@@ -54,7 +56,7 @@ serve(async (req) => {
           text: `[Audio: ${audioSnippet}]`
         }),
         { 
-          headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+          headers: jsonHeaders,
           status: 200
         }
       );
@@ -111,7 +113,7 @@ serve(async (req) => {
         tokens_used: data.usage?.total_tokens
       }),
       { 
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        headers: jsonHeaders,
         status: 200
       }
     );
@@ -126,7 +128,7 @@ serve(async (req) => {
       }),
       {
         status: 500,
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        headers: jsonHeaders,
       }
     );
   }
@@ -166,23 +168,74 @@ function buildSystemPrompt(client: any): string {
   return contextParts.join('');
 }
 
-async function checkAudioSnippets(userInput: string, audioSnippets: any): Promise<string | null> {
+interface SnippetMatcher {
+  // One lookahead group per intent, in intent order: at each position the
+  // lowest-index intent whose keyword starts there is captured
+  pattern: RegExp;
+  audioFiles: string[];
+  builtAt: number;
+}
+
+// Compiled matchers keyed by client_id + updated_at, so repeated requests for
+// the same client reuse one regex without re-reading the whole mapping. Entries
+// also expire, in case audio_snippets is edited without bumping updated_at.
+const snippetMatcherCache = new Map<string, SnippetMatcher>();
+const SNIPPET_MATCHER_CACHE_MAX_ENTRIES = 500;
+const SNIPPET_MATCHER_CACHE_TTL_MS = 10 * 60 * 1000;
+
+function escapeRegExp(text: string): string {
+  return text.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+}
+
+function getSnippetMatcher(client: any): SnippetMatcher {
+  const cacheKey = `${client.client_id}:${client.updated_at}`;
+
+  let matcher = snippetMatcherCache.get(cacheKey);
+  if (matcher && Date.now() - matcher.builtAt < SNIPPET_MATCHER_CACHE_TTL_MS) return matcher;
+
+  const entries = Object.entries(client.audio_snippets as Record<string, unknown>);
+  const groups = entries.map(([intent]) =>
+    `(${intent.toLowerCase().split('_').map(escapeRegExp).join('|')})`
+  );
+
+  matcher = {
+    // Case-insensitive so the input can be scanned as-is, without a lowercased copy
+    pattern: new RegExp(`(?=${groups.join('|')})`, 'gi'),
+    audioFiles: entries.map(([, audioFile]) => audioFile as string),
+    builtAt: Date.now(),
+  };
+
+  snippetMatcherCache.delete(cacheKey);
+  if (snippetMatcherCache.size >= SNIPPET_MATCHER_CACHE_MAX_ENTRIES) {
+    snippetMatcherCache.delete(snippetMatcherCache.keys().next().value!);
+  }
+  snippetMatcherCache.set(cacheKey, matcher);
+  return matcher;
+}
+
+async function checkAudioSnippets(userInput: string, client: any): Promise<string | null> {
   // Replaces smart_router.py logic for audio snippet matching
   
-  if (!audioSnippets || typeof audioSnippets !== 'object') {
+  if (!client.audio_snippets || typeof client.audio_snippets !== 'object') {
     return null;
   }
 
-  const inputLower = userInput.toLowerCase().trim();
+  const { pattern, audioFiles } = getSnippetMatcher(client);
+  if (audioFiles.length === 0) {
+    return null;
+  }
 
-  // Check for keyword matches in audio snippet mappings
-  for (const [intent, audioFile] of Object.entries(audioSnippets)) {
-    const keywords = intent.toLowerCase().split('_');
-    
-    if (keywords.some(keyword => inputLower.includes(keyword))) {
-      return audioFile as string;
+  // Single pass over the input for all keywords; keep the earliest intent hit
+  let bestIntent = audioFiles.length;
+  for (const match of userInput.matchAll(pattern)) {
+    for (let i = 1; i <= bestIntent && i < match.length; i++) {
+      if (match[i] !== undefined) {
+        bestIntent = i - 1;
+        break;
+      }
     }
+    if (bestIntent === 0) break;
   }
 
-  return null;
+  return bestIntent < audioFiles.length ? audioFiles[bestIntent] : null;
 }
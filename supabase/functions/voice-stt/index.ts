@@ -1,4 +1,3 @@
-import "https://deno.land/x/xhr@0.1.0/mod.ts";
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts";
 
 const corsHeaders = {
@@ -6,6 +5,10 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+const jsonHeaders = { ...corsHeaders, 'Content-Type': 'application/json' };
+
+const DEEPGRAM_API_KEY = Deno.env.get('DEEPGRAM_API_KEY');
+
 serve(async (req) => {
   if (req.method === 'OPTIONS') {
     return new Response(null, { headers: corsHeaders });
@@ -18,7 +21,6 @@ serve(async (req) => {
       throw new Error('No audio data provided');
     }
 
-    const DEEPGRAM_API_KEY = Deno.env.get('DEEPGRAM_API_KEY');
     if (!DEEPGRAM_API_KEY) {
       throw new Error('DEEPGRAM_API_KEY not configured');
     }
@@ -55,7 +57,7 @@ serve(async (req) => {
         words: result.results?.channels?.[0]?.alternatives?.[0]?.words
       }),
       { 
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        headers: jsonHeaders,
         status: 200
       }
     );
@@ -69,7 +71,7 @@ serve(async (req) => {
       }),
       {
         status: 500,
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        headers: jsonHeaders,
       }
     );
   }
@@ -1,4 +1,3 @@
-import "https://deno.land/x/xhr@0.1.0/mod.ts";
 import { serve } from "https://deno.land/std@0.168.0/http/server.ts";
 import { createClient } from "https://esm.sh/@supabase/supabase-js@2";
 
@@ -7,6 +6,26 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+const jsonHeaders = { ...corsHeaders, 'Content-Type': 'application/json' };
+
+const ELEVENLABS_API_KEY = Deno.env.get('ELEVENLABS_API_KEY');
+
+const supabaseClient = createClient(
+  Deno.env.get('SUPABASE_URL') ?? '',
+  Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
+);
+
+// Synthesized audio cache keyed by SHA-256 of (voice, model, settings, text).
+// Repeated prompts (greetings, fallbacks, shared boilerplate) skip ElevenLabs
+// entirely while the isolate stays warm. Oldest entry is evicted first.
+const TTS_CACHE_MAX_ENTRIES = 200;
+const ttsCache = new Map<string, { audio: string; size_bytes: number }>();
+
+async function ttsCacheKey(...parts: Array<string | number>): Promise<string> {
+  const digest = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(parts.join('\0')));
+  return Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, '0')).join('');
+}
+
 serve(async (req) => {
   if (req.method === 'OPTIONS') {
     return new Response(null, { headers: corsHeaders });
@@ -19,7 +38,6 @@ serve(async (req) => {
       throw new Error('No text provided');
     }
 
-    const ELEVENLABS_API_KEY = Deno.env.get('ELEVENLABS_API_KEY');
     if (!ELEVENLABS_API_KEY) {
       throw new Error('ELEVENLABS_API_KEY not configured');
     }
@@ -27,11 +45,6 @@ serve(async (req) => {
     console.log(`🔊 TTS request for client: ${client_id}`);
 
     // Get client's TTS configuration from database
-    const supabaseClient = createClient(
-      Deno.env.get('SUPABASE_URL') ?? '',
-      Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
-    );
-
     const { data: client } = await supabaseClient
       .from('voice_ai_clients')
       .select('tts_config, voice_id')
@@ -41,7 +54,29 @@ serve(async (req) => {
     const ttsConfig = client?.tts_config || {};
     const finalVoiceId = voice_id || client?.voice_id || '6FINSXmstr7jTeJkpd2r'; // Default voice
 
-    console.log(`Using voice: ${finalVoiceId}, model: ${ttsConfig.model || 'eleven_turbo_v2_5'}`);
+    const modelId = ttsConfig.model || 'eleven_turbo_v2_5';
+    const stability = ttsConfig.stability || 0.5;
+    const similarityBoost = ttsConfig.similarity_boost || 0.75;
+
+    console.log(`Using voice: ${finalVoiceId}, model: ${modelId}`);
+
+    const cacheKey = await ttsCacheKey(finalVoiceId, modelId, stability, similarityBoost, text);
+    const cached = ttsCache.get(cacheKey);
+    if (cached) {
+      console.log(`✅ TTS cache hit (${cached.size_bytes} bytes)`);
+      return new Response(
+        JSON.stringify({
+          audio: cached.audio,
+          format: 'mp3',
+          voice_id: finalVoiceId,
+          size_bytes: cached.size_bytes
+        }),
+        {
+          headers: jsonHeaders,
+          status: 200
+        }
+      );
+    }
 
     // Generate speech with ElevenLabs
     const response = await fetch(
@@ -55,10 +90,10 @@ serve(async (req) => {
         },
         body: JSON.stringify({
           text: text,
-          model_id: ttsConfig.model || 'eleven_turbo_v2_5',
+          model_id: modelId,
           voice_settings: {
-            stability: ttsConfig.stability || 0.5,
-            similarity_boost: ttsConfig.similarity_boost || 0.75,
+            stability: stability,
+            similarity_boost: similarityBoost,
             style: 0,
             use_speaker_boost: true
           }
@@ -76,6 +111,11 @@ serve(async (req) => {
 
     console.log(`✅ Generated ${audioBuffer.byteLength} bytes of audio`);
 
+    if (ttsCache.size >= TTS_CACHE_MAX_ENTRIES) {
+      ttsCache.delete(ttsCache.keys().next().value!);
+    }
+    ttsCache.set(cacheKey, { audio: audioBase64, size_bytes: audioBuffer.byteLength });
+
     return new Response(
       JSON.stringify({
         audio: audioBase64,
@@ -84,7 +124,7 @@ serve(async (req) => {
         size_bytes: audioBuffer.byteLength
       }),
       { 
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        headers: jsonHeaders,
         status: 200
       }
     );
@@ -97,7 +137,7 @@ serve(async (req) => {
       }),
       {
         status: 500,
-        headers: { ...corsHeaders, 'Content-Type': 'application/json' },
+        headers: jsonHeaders,
       }
     );
   }
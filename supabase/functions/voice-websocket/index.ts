@@ -6,6 +6,14 @@ const corsHeaders = {
   'Access-Control-Allow-Headers': 'authorization, x-client-info, apikey, content-type',
 };
 
+// Provider configuration - read once per isolate instead of on every turn
+const SUPABASE_URL = Deno.env.get('SUPABASE_URL') ?? '';
+const SUPABASE_SERVICE_ROLE_KEY = Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? '';
+const SERVE_AUDIO_SNIPPET_URL = `${SUPABASE_URL}/functions/v1/serve-audio-snippet`;
+const DEEPGRAM_API_KEY = Deno.env.get('DEEPGRAM_API_KEY');
+const ELEVENLABS_API_KEY = Deno.env.get('ELEVENLABS_API_KEY');
+const OPENAI_API_KEY = Deno.env.get('OPENAI_API_KEY');
+
 // Session state management
 const activeSessions = new Map<string, VoiceSession>();
 
@@ -19,10 +27,7 @@ serve(async (req) => {
 
   const { socket, response } = Deno.upgradeWebSocket(req);
   
-  const supabaseClient = createClient(
-    Deno.env.get('SUPABASE_URL') ?? '',
-    Deno.env.get('SUPABASE_SERVICE_ROLE_KEY') ?? ''
-  );
+  const supabaseClient = createClient(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY);
 
   const url = new URL(req.url);
   const clientId = url.searchParams.get('client_id');
@@ -98,16 +103,42 @@ class VoiceSession {
   private sentimentScore: number = 0;
   private conversationStage: string = 'greeting';
   private transferRequested: boolean = false;
+  // Monotonic start mark for duration_seconds (immune to wall-clock adjustments)
+  private startedAt: number = 0;
+  // Flattened audio_snippets index (parallel arrays, built once per session):
+  // snippetKeywords[i] belongs to snippetFiles[snippetFileIndex[i]]
+  private snippetKeywords: string[] = [];
+  private snippetFileIndex: number[] = [];
+  private snippetFiles: string[] = [];
+  // conversation_logs writes run off the turn's critical path; chaining them
+  // keeps rows in transcript order without making the caller wait. Rows that
+  // arrive while a write is in flight are coalesced into the next insert.
+  private pendingLogWrites: Promise<void> = Promise.resolve();
+  private pendingLogRows: Array<{ speaker: string; content: string }> = [];
 
   constructor(client: any, callSid: string, supabase: any, twilioSocket: WebSocket) {
     this.client = client;
     this.callSid = callSid;
     this.supabase = supabase;
     this.twilioSocket = twilioSocket;
+    this.buildSnippetIndex();
+  }
+
+  private buildSnippetIndex() {
+    const audioSnippets = this.client.audio_snippets || {};
+
+    for (const [intent, audioFile] of Object.entries(audioSnippets)) {
+      const fileIndex = this.snippetFiles.push(audioFile as string) - 1;
+      for (const keyword of intent.toLowerCase().split('_')) {
+        this.snippetKeywords.push(keyword);
+        this.snippetFileIndex.push(fileIndex);
+      }
+    }
   }
 
   async start() {
     this.isActive = true;
+    this.startedAt = performance.now();
     console.log(`🚀 Starting Voice AI session for ${this.client.client_id}`);
     
     // Create call session in DB
@@ -132,7 +163,6 @@ class VoiceSession {
   }
 
   private async initDeepgram() {
-    const DEEPGRAM_API_KEY = Deno.env.get('DEEPGRAM_API_KEY');
     if (!DEEPGRAM_API_KEY) {
       console.error('❌ DEEPGRAM_API_KEY not set');
       return;
@@ -184,7 +214,6 @@ class VoiceSession {
   }
 
   private async initElevenLabs() {
-    const ELEVENLABS_API_KEY = Deno.env.get('ELEVENLABS_API_KEY');
     if (!ELEVENLABS_API_KEY) {
       console.error('❌ ELEVENLABS_API_KEY not set');
       return;
@@ -252,11 +281,12 @@ class VoiceSession {
       case 'media':
         // Forward audio to Deepgram for STT
         if (this.deepgramSocket?.readyState === WebSocket.OPEN && !this.isSpeaking) {
-          const audioData = new Uint8Array(
-            atob(message.media.payload)
-              .split('')
-              .map(c => c.charCodeAt(0))
-          );
+          // Decode straight into the byte array (no intermediate char array)
+          const audioBinary = atob(message.media.payload);
+          const audioData = new Uint8Array(audioBinary.length);
+          for (let i = 0; i < audioBinary.length; i++) {
+            audioData[i] = audioBinary.charCodeAt(i);
+          }
           this.deepgramSocket.send(audioData);
         }
         break;
@@ -293,16 +323,8 @@ class VoiceSession {
       timestamp: new Date().toISOString()
     });
 
-    // Log conversation
-    await this.supabase
-      .from('conversation_logs')
-      .insert({
-        call_sid: this.callSid,
-        client_id: this.client.client_id,
-        speaker: 'user',
-        message_type: 'text',
-        content: userInput
-      });
+    // Log conversation (queued - doesn't delay sentiment analysis or the reply)
+    this.logConversation('user', userInput);
 
     // Analyze sentiment and intent
     await this.analyzeSentimentAndIntent(userInput);
@@ -330,13 +352,14 @@ class VoiceSession {
   }
 
   private async checkAudioSnippets(userInput: string): Promise<string | null> {
-    const audioSnippets = this.client.audio_snippets || {};
     const inputLower = userInput.toLowerCase().trim();
+    const keywords = this.snippetKeywords;
 
-    for (const [intent, audioFile] of Object.entries(audioSnippets)) {
-      const keywords = intent.toLowerCase().split('_');
-      if (keywords.some(keyword => inputLower.includes(keyword))) {
-        return audioFile as string;
+    // Keywords are stored in intent order, so the first hit is the same
+    // snippet the per-intent scan would have chosen
+    for (let i = 0; i < keywords.length; i++) {
+      if (inputLower.includes(keywords[i])) {
+        return this.snippetFiles[this.snippetFileIndex[i]];
       }
     }
 
@@ -346,7 +369,7 @@ class VoiceSession {
   private async playAudioSnippet(audioFile: string) {
     try {
       // Fetch audio snippet from the serve-audio-snippet edge function
-      const snippetUrl = `${Deno.env.get('SUPABASE_URL')}/functions/v1/serve-audio-snippet?client_id=${this.client.client_id}&filename=${audioFile}`;
+      const snippetUrl = `${SERVE_AUDIO_SNIPPET_URL}?client_id=${this.client.client_id}&filename=${audioFile}`;
       
       const response = await fetch(snippetUrl);
       
@@ -376,7 +399,6 @@ class VoiceSession {
   }
 
   private async generateStreamingResponse(userInput: string) {
-    const OPENAI_API_KEY = Deno.env.get('OPENAI_API_KEY');
     if (!OPENAI_API_KEY) {
       console.error('❌ OPENAI_API_KEY not set');
       return;
@@ -472,15 +494,7 @@ class VoiceSession {
       });
 
       // Log conversation
-      await this.supabase
-        .from('conversation_logs')
-        .insert({
-          call_sid: this.callSid,
-          client_id: this.client.client_id,
-          speaker: 'assistant',
-          message_type: 'text',
-          content: fullResponse
-        });
+      this.logConversation('assistant', fullResponse);
 
     } catch (error) {
       console.error('❌ Error generating AI response:', error);
@@ -488,20 +502,44 @@ class VoiceSession {
     }
   }
 
+  private logConversation(speaker: 'user' | 'assistant', content: string) {
+    this.pendingLogRows.push({ speaker, content });
+    // A flush is already queued behind the in-flight write - it will pick this row up
+    if (this.pendingLogRows.length > 1) return;
+
+    this.pendingLogWrites = this.pendingLogWrites.then(async () => {
+      const rows = this.pendingLogRows;
+      this.pendingLogRows = [];
+
+      try {
+        const { error } = await this.supabase
+          .from('conversation_logs')
+          .insert(rows.map(row => ({
+            call_sid: this.callSid,
+            client_id: this.client.client_id,
+            speaker: row.speaker,
+            message_type: 'text',
+            content: row.content
+          })));
+
+        if (error) throw error;
+      } catch (error) {
+        console.error('❌ Error logging conversation:', error);
+      }
+    });
+  }
+
   private async speakText(text: string) {
     this.isSpeaking = true;
     
     if (this.elevenLabsSocket?.readyState === WebSocket.OPEN) {
-      // Stream text to ElevenLabs
-      const words = text.split(' ');
-      for (const word of words) {
-        this.elevenLabsSocket.send(JSON.stringify({
-          text: word + ' ',
-          try_trigger_generation: true
-        }));
-        // Small delay to allow streaming
-        await new Promise(resolve => setTimeout(resolve, 50));
-      }
+      // Send the whole text in one message - ElevenLabs buffers input and
+      // schedules generation itself, so pacing it word by word (50ms apart)
+      // only held back the start of playback
+      this.elevenLabsSocket.send(JSON.stringify({
+        text: text + ' ',
+        try_trigger_generation: true
+      }));
       
       // Send EOS
       this.elevenLabsSocket.send(JSON.stringify({
@@ -518,17 +556,11 @@ class VoiceSession {
     // Note: This is a simplified conversion. In production, use proper audio codec library
     
     try {
-      // Decode base64 MP3 audio
-      const mp3Binary = atob(base64Audio);
-      const mp3Bytes = new Uint8Array(mp3Binary.length);
-      for (let i = 0; i < mp3Binary.length; i++) {
-        mp3Bytes[i] = mp3Binary.charCodeAt(i);
-      }
-
       // TODO: Implement proper MP3 to μ-law conversion
-      // For now, we're passing through the audio as-is
+      // For now, we're passing the base64 audio through as-is (no decode needed
+      // until a conversion exists)
       // This may cause audio quality issues that need proper codec conversion
-      
+
       const mediaMessage = {
         event: 'media',
         streamSid: this.streamSid,
@@ -546,7 +578,6 @@ class VoiceSession {
   }
 
   private async analyzeSentimentAndIntent(userInput: string) {
-    const OPENAI_API_KEY = Deno.env.get('OPENAI_API_KEY');
     if (!OPENAI_API_KEY) return;
 
     try {
@@ -657,18 +688,13 @@ class VoiceSession {
 
   private async handleStreamStop() {
     this.isActive = false;
-    
-    // Update call session with final transcript
-    const endTime = new Date();
-    const { data: session } = await this.supabase
-      .from('call_sessions')
-      .select('start_time')
-      .eq('call_sid', this.callSid)
-      .single();
 
-    const durationSeconds = session 
-      ? Math.floor((endTime.getTime() - new Date(session.start_time).getTime()) / 1000)
-      : 0;
+    // Let queued conversation_logs writes land before closing out the session
+    await this.pendingLogWrites;
+
+    // Update call session with final transcript
+    const endTimeIso = new Date().toISOString();
+    const durationSeconds = Math.floor((performance.now() - this.startedAt) / 1000);
 
     // Determine outcome type based on conversation
     const outcomeType = this.transferRequested ? 'transferred_to_agent' :
@@ -680,11 +706,11 @@ class VoiceSession {
       .update({
         transcript: this.transcript,
         transcript_summary: this.generateTranscriptSummary(),
-        end_time: endTime.toISOString(),
+        end_time: endTimeIso,
         duration_seconds: durationSeconds,
         status: 'completed',
         outcome_type: outcomeType,
-        updated_at: new Date().toISOString()
+        updated_at: endTimeIso
       })
       .eq('call_sid', this.callSid);
 
@@ -0,0 +1,48 @@
+-- Migration: Atomic minute usage increment
+-- Date: November 9, 2025
+-- Issue: trackMinuteUsage read trial/paid_minutes_used, added the call's minutes in the
+--        edge function, then wrote the total back. Two calls ending together (or a
+--        worker dying between the read and the write) lost or half-applied usage.
+-- Solution: Apply the increment in a single UPDATE ... RETURNING so the row is never
+--           observed half-updated and concurrent calls cannot overwrite each other.
+
+CREATE OR REPLACE FUNCTION increment_minutes_used(p_client_id text, p_minutes integer)
+RETURNS TABLE (
+  client_id text,
+  trial_minutes integer,
+  trial_minutes_used integer,
+  paid_plan boolean,
+  paid_minutes_used integer,
+  paid_minutes_included integer,
+  dodo_customer_id text
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  RETURN QUERY
+  UPDATE voice_ai_clients vac
+  SET
+    trial_minutes_used = CASE WHEN COALESCE(vac.paid_plan, FALSE)
+                              THEN vac.trial_minutes_used
+                              ELSE COALESCE(vac.trial_minutes_used, 0) + p_minutes END,
+    paid_minutes_used = CASE WHEN COALESCE(vac.paid_plan, FALSE)
+                             THEN COALESCE(vac.paid_minutes_used, 0) + p_minutes
+                             ELSE vac.paid_minutes_used END,
+    updated_at = NOW()
+  WHERE vac.client_id = p_client_id
+  RETURNING
+    vac.client_id,
+    vac.trial_minutes,
+    vac.trial_minutes_used,
+    vac.paid_plan,
+    vac.paid_minutes_used,
+    vac.paid_minutes_included,
+    vac.dodo_customer_id;
+END;
+$$;
+
+-- Only the service role (edge functions) records usage
+REVOKE ALL ON FUNCTION increment_minutes_used(text, integer) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION increment_minutes_used(text, integer) TO service_role;
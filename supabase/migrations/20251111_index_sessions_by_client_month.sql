@@ -0,0 +1,15 @@
+-- Migration: Composite (client_id, created_at) indexes for monthly usage queries
+-- Date: November 11, 2025
+-- Issue: The dashboard/analytics hooks fetch a client's sessions for the current
+--        month (.eq('client_id', ...).gte('created_at', ...).order('created_at')).
+--        call_sessions only has a single-column created_at index and chat_sessions
+--        only client_id, so each query walks every row for the period (all clients)
+--        or every row the client ever produced, then sorts.
+-- Solution: Index both tables on (client_id, created_at DESC) so the month range for
+--           one client is a single ordered index range scan.
+
+CREATE INDEX IF NOT EXISTS idx_call_sessions_client_created
+  ON call_sessions(client_id, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_client_created
+  ON chat_sessions(client_id, created_at DESC);
@@ -0,0 +1,15 @@
+-- Migration: Index call_sessions by call_sid and conversation_logs by client
+-- Date: November 12, 2025
+-- Issue: Every status webhook, call finalization and transfer updates call_sessions
+--        with .eq('call_sid', ...), and the Logs page reads a client's latest
+--        conversation_logs (.eq('client_id', ...).order('created_at').limit(200)).
+--        Neither column is indexed, so both are full scans that grow with total
+--        call volume across all clients.
+-- Solution: Index call_sessions(call_sid) and conversation_logs(client_id, created_at DESC)
+--           so each becomes an index lookup / bounded index range scan.
+
+CREATE INDEX IF NOT EXISTS idx_call_sessions_call_sid
+  ON call_sessions(call_sid);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_logs_client_created
+  ON conversation_logs(client_id, created_at DESC);
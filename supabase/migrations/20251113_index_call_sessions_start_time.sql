@@ -0,0 +1,10 @@
+-- Migration: Index call_sessions by start_time for per-day queries
+-- Date: November 13, 2025
+-- Issue: The admin dashboard totals today's revenue with a start_time day range
+--        (.gte('start_time', 'YYYY-MM-DDT00:00:00').lt(...T23:59:59)), but only
+--        created_at is indexed, so every refresh scans all call_sessions ever recorded.
+-- Solution: Add a btree index on start_time so a single day's calls are one index
+--           range scan regardless of how much history the table holds.
+
+CREATE INDEX IF NOT EXISTS idx_call_sessions_start_time
+  ON call_sessions(start_time);